@@ -0,0 +1,50 @@
+import asyncio
+import os
+import statistics
+import time
+
+# Benchmarks seed a disposable database: its tables are dropped and recreated.
+BENCH_DB_URL = os.environ.get("BENCH_DB_URL")
+if not BENCH_DB_URL:
+    raise SystemExit("BENCH_DB_URL is not set (needs a scratch Postgres)")
+os.environ["DB_URL"] = BENCH_DB_URL
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from sqlalchemy import text
+
+from src.database.db import session_manager
+from src.models.user_model import Base
+import src.models.chat_model  # noqa: F401  (registers the chat tables)
+
+
+async def reset(seed_sql: str = "") -> None:
+    async with session_manager.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        for stmt in seed_sql.split(";"):
+            if stmt.strip():
+                await conn.execute(text(stmt))
+    async with session_manager.engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE"))
+
+
+async def timed(fn, repeat: int = 20) -> float:
+    """Median wall time of `await fn()` in milliseconds, after one warm-up."""
+    await fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(main) -> None:
+    async def wrapped():
+        try:
+            await main()
+        finally:
+            await session_manager.engine.dispose()
+
+    asyncio.run(wrapped())
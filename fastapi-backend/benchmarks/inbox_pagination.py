@@ -0,0 +1,55 @@
+"""Inbox page latency at increasing depth: limit/offset versus keyset cursor.
+
+BENCH_DB_URL=postgresql+asyncpg://... python -m benchmarks.inbox_pagination
+"""
+
+import argparse
+
+from benchmarks.common import reset, run, timed
+from src.database.db import session_manager
+from src.services.conversation_service import ConversationService
+
+SEED = """
+INSERT INTO users (id, username, email, hashed_password, created_at, updated_at)
+SELECT g, 'u' || g, 'u' || g || '@x', 'x', now(), now()
+FROM generate_series(1, {peers} + 1) g;
+INSERT INTO conversations (user1_id, user2_id, created_at, last_message_at,
+                           message_count)
+SELECT 1, g, now() - interval '1 year',
+       now() - (g % 9973) * interval '1 minute', 0
+FROM generate_series(2, {peers} + 1) g
+"""
+
+
+async def main(peers: int, limit: int, depths):
+    await reset(SEED.format(peers=peers))
+    print(f"{peers} conversations, page size {limit}")
+    print(f"{'depth':>8} {'offset ms':>10} {'cursor ms':>10}")
+    async with session_manager.session() as db:
+        svc = ConversationService(db)
+        for depth in depths:
+            if depth >= peers:
+                continue
+            before = None
+            if depth:
+                # The cursor a client would hold after scrolling to `depth`.
+                (row,) = await svc.list_inbox(1, limit=1, offset=depth - 1)
+                before = (row.last_activity_at, row.Conversation.id)
+
+            async def by_offset():
+                await svc.list_inbox(1, limit=limit, offset=depth)
+
+            async def by_cursor():
+                await svc.list_inbox(1, limit=limit, before=before)
+
+            offset_ms = await timed(by_offset)
+            cursor_ms = await timed(by_cursor)
+            print(f"{depth:>8} {offset_ms:>10.2f} {cursor_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--peers", type=int, default=50000)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+    run(lambda: main(args.peers, args.limit, [0, 1000, 5000, 20000, 49000]))
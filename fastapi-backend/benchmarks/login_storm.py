@@ -0,0 +1,140 @@
+"""WebSocket round-trip latency while a burst of logins hashes passwords.
+
+Serves the app with uvicorn on a local port, keeps one chat socket pinging,
+and fires concurrent logins: first with none, then through the bcrypt pool,
+then with bcrypt run inline on the event loop (the behaviour before the
+pool). Logins beyond PASSWORD_HASH_MAX_PENDING are answered with 503.
+
+    BENCH_DB_URL=postgresql+asyncpg://... python -m benchmarks.login_storm
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import socket
+import statistics
+import time
+from collections import Counter
+
+import bcrypt
+import httpx
+import jwt
+import uvicorn
+import websockets
+
+from benchmarks.common import reset, run
+from src.conf.config import settings
+from src.main import app
+from src.services.password_hasher import password_hasher
+
+SEED = """
+INSERT INTO users (id, username, email, hashed_password, created_at, updated_at)
+VALUES (1, 'alice', 'alice@x', '{hashed}', now(), now()),
+       (2, 'bob', 'bob@x', 'x', now(), now());
+INSERT INTO conversations (id, user1_id, user2_id, created_at)
+VALUES (1, 1, 2, now())
+"""
+
+
+async def _inline(fn):
+    return fn()
+
+
+async def ping_while(ws, work):
+    samples, done = [], False
+
+    async def pinger():
+        while not done:
+            start = time.perf_counter()
+            await ws.send(json.dumps({"type": "ping"}))
+            while json.loads(await ws.recv())["type"] != "echo":
+                pass
+            samples.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.02)
+
+    task = asyncio.ensure_future(pinger())
+    result = await work()
+    done = True
+    await task
+    return result, samples
+
+
+async def storm(base: str, logins: int, concurrency: int) -> Counter:
+    codes, gate = Counter(), asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(base_url=base, timeout=60) as http:
+
+        async def login():
+            async with gate:
+                res = await http.post(
+                    "/api/auth/login",
+                    data={"username": "alice@x", "password": "secret"},
+                )
+                codes[res.status_code] += 1
+
+        await asyncio.gather(*(login() for _ in range(logins)))
+    return codes
+
+
+async def main(logins: int, concurrency: int):
+    hashed = bcrypt.hashpw(b"secret", bcrypt.gensalt()).decode()
+    await reset(SEED.format(hashed=hashed))
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="critical")
+    )
+    serving = asyncio.ensure_future(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    token = jwt.encode({"sub": "alice"}, settings.SECRET_KEY, settings.ALGORITHM)
+    url = f"ws://127.0.0.1:{port}/ws/conversation/1?token={token}"
+    base = f"http://127.0.0.1:{port}"
+    # The session manager logs every HTTPException raised inside a session;
+    # inline hashing also times out pool checkouts. Both are counted below.
+    logging.getLogger("unicorn.error").setLevel(logging.CRITICAL)
+    print(
+        f"{logins} logins, {concurrency} concurrent, "
+        f"{settings.PASSWORD_HASH_WORKERS} bcrypt workers, "
+        f"max pending {settings.PASSWORD_HASH_MAX_PENDING}"
+    )
+    print(f"{'phase':>7} {'2xx':>5} {'503':>5} {'other':>5}", end="")
+    print(f" {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+
+    async def idle():
+        await asyncio.sleep(3)
+        return Counter()
+
+    async def logins_inline():
+        password_hasher._run = _inline
+        return await storm(base, logins, concurrency)
+
+    phases = [
+        ("idle", idle),
+        ("pool", lambda: storm(base, logins, concurrency)),
+        ("inline", logins_inline),
+    ]
+    try:
+        async with websockets.connect(url) as ws:
+            await ws.recv()
+            for name, work in phases:
+                codes, samples = await ping_while(ws, work)
+                other = sum(codes.values()) - codes[200] - codes[503]
+                q = statistics.quantiles(samples, n=100, method="inclusive")
+                print(f"{name:>7} {codes[200]:>5} {codes[503]:>5} {other:>5}", end="")
+                print(f" {q[49]:>8.1f} {q[98]:>8.1f} {max(samples):>8.1f}")
+    finally:
+        server.should_exit = True
+        await serving
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+    run(lambda: main(args.logins, args.concurrency))
@@ -0,0 +1,90 @@
+"""History page latency as one conversation grows from 1k to 10M messages.
+
+Each step appends messages to the conversation (every tenth soft-deleted) and
+then as many to another one, so the newest rows in the table belong to other
+chats. It then times a 50-message page at the newest end, the middle
+(before_id) and the oldest end (after_id). --without-index repeats the run
+with ix_messages_conversation_live dropped, for comparison.
+
+    BENCH_DB_URL=postgresql+asyncpg://... python -m benchmarks.message_history
+"""
+
+import argparse
+import time
+
+from sqlalchemy import func, select, text
+
+from benchmarks.common import reset, timed, run
+from src.controllers.message_controller import MessageController
+from src.database.db import session_manager
+from src.models.chat_model import Message
+
+SEED = """
+INSERT INTO users (id, username, email, hashed_password, created_at, updated_at)
+VALUES (1, 'a', 'a@x', 'x', now(), now()), (2, 'b', 'b@x', 'x', now(), now()),
+       (3, 'c', 'c@x', 'x', now(), now());
+INSERT INTO conversations (id, user1_id, user2_id, created_at)
+VALUES (1, 1, 2, now()), (2, 1, 3, now())
+"""
+
+APPEND = """
+INSERT INTO messages (conversation_id, sender_id, content, created_at,
+                      updated_at, is_edited, deleted_at)
+SELECT :conversation_id, 1 + g % 2, 'message ' || g, now(), now(), false,
+       CASE WHEN g % 10 = 0 THEN now() END
+FROM generate_series(CAST(:start AS bigint), CAST(:stop AS bigint)) g
+"""
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+
+async def grow(total: int, size: int) -> None:
+    async with session_manager.engine.begin() as conn:
+        for conversation_id in (1, 2):
+            await conn.execute(
+                text(APPEND),
+                {"conversation_id": conversation_id, "start": total + 1, "stop": size},
+            )
+    async with session_manager.engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE messages"))
+
+
+async def main(max_size: int, without_index: bool):
+    await reset(SEED)
+    if without_index:
+        async with session_manager.engine.begin() as conn:
+            await conn.execute(text("DROP INDEX ix_messages_conversation_live"))
+
+    print(f"{'messages':>10} {'seed s':>7} {'newest ms':>10}", end="")
+    print(f" {'middle ms':>10} {'oldest ms':>10}")
+    total = 0
+    for size in [s for s in SIZES if s <= max_size]:
+        started = time.perf_counter()
+        await grow(total, size)
+        seeded = time.perf_counter() - started
+        total = size
+
+        async with session_manager.session() as db:
+            ids = select(func.min(Message.id), func.max(Message.id)).where(
+                Message.conversation_id == 1
+            )
+            first, last = (await db.execute(ids)).one()
+            messages = MessageController(db)
+
+            async def page(**kwargs):
+                await messages.list_for_conversation(1, limit=50, **kwargs)
+
+            newest = await timed(page)
+            middle = await timed(lambda: page(before_id=(first + last) // 2))
+            oldest = await timed(lambda: page(after_id=first))
+        print(f"{size:>10} {seeded:>7.1f} {newest:>10.2f}", end="")
+        print(f" {middle:>10.2f} {oldest:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-size", type=int, default=SIZES[-1])
+    parser.add_argument("--without-index", action="store_true")
+    args = parser.parse_args()
+    run(lambda: main(args.max_size, args.without_index))
@@ -0,0 +1,119 @@
+"""Message send latency: the single-transaction write path versus the old
+commit/refresh sequence it replaced.
+
+    BENCH_DB_URL=postgresql+asyncpg://... python -m benchmarks.message_write
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+
+from benchmarks.common import reset, run, timed
+from src.database.db import session_manager
+from src.models.chat_model import Attachment, Message
+from src.services.message_service import MessageService
+
+SEED = """
+INSERT INTO users (id, username, email, hashed_password, created_at, updated_at)
+VALUES (1, 'a', 'a@x', 'x', now(), now()), (2, 'b', 'b@x', 'x', now(), now());
+INSERT INTO conversations (id, user1_id, user2_id, created_at)
+VALUES (1, 1, 2, now())
+"""
+
+
+def _attachments(n: int):
+    return [
+        {
+            "file_name": f"f{i}.png",
+            "mime": "image/png",
+            "size_bytes": 1024,
+            "storage": "local",
+            "file_path": f"/media/f{i}.png",
+        }
+        for i in range(n)
+    ]
+
+
+async def old_path(n: int):
+    # The WebSocket handler before the shared write path: two commits, a
+    # refresh for the message and one per attachment.
+    async with session_manager.session() as db:
+        msg = Message(
+            conversation_id=1,
+            sender_id=1,
+            content="hello",
+            created_at=datetime.now(timezone.utc),
+        )
+        db.add(msg)
+        await db.commit()
+        await db.refresh(msg)
+        atts = []
+        for a in _attachments(n):
+            att = Attachment(
+                message_id=msg.id,
+                file_name=a["file_name"],
+                mime_type=a["mime"],
+                size_bytes=a["size_bytes"],
+                storage=a["storage"],
+                file_path=a["file_path"],
+            )
+            db.add(att)
+            atts.append(att)
+        if atts:
+            await db.commit()
+            for att in atts:
+                await db.refresh(att)
+
+
+async def new_path(n: int):
+    async with session_manager.session() as db:
+        await MessageService(db).send_message(
+            conversation_id=1,
+            sender_id=1,
+            content="hello",
+            attachments=_attachments(n),
+        )
+
+
+async def throughput(send, n: int, total: int, concurrency: int) -> float:
+    left = iter(range(total))
+
+    async def worker():
+        for _ in left:
+            await send(n)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - start)
+
+
+async def main(total: int, concurrency: int):
+    await reset(SEED)
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    sync_engine = session_manager.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", count)
+    event.listen(sync_engine, "commit", count)
+    print(f"{'atts':>4} {'path':>4} {'stmts':>6} {'p50 ms':>8} {'msg/s':>8}")
+    for n in (0, 1, 4):
+        for name, send in (("old", old_path), ("new", new_path)):
+            statements.clear()
+            await send(n)
+            stmts = len(statements)
+            p50 = await timed(lambda: send(n), repeat=200)
+            rate = await throughput(send, n, total, concurrency)
+            print(f"{n:>4} {name:>4} {stmts:>6} {p50:>8.2f} {rate:>8.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--total", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    run(lambda: main(args.total, args.concurrency))
@@ -0,0 +1,31 @@
+"""attachment previews
+
+Revision ID: 0a9e5d3c7b21
+Revises: f7c3e1a2b604
+Create Date: 2026-10-18 15:12:08.371554
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a9e5d3c7b21'
+down_revision: Union[str, Sequence[str], None] = 'f7c3e1a2b604'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('stored_objects', sa.Column('previews', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('attachments', sa.Column('sha256', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('attachments', 'sha256')
+    op.drop_column('stored_objects', 'previews')
@@ -0,0 +1,28 @@
+"""message version for optimistic edits
+
+Revision ID: 5d8b2f6e1c47
+Revises: b3e7d1c9a465
+Create Date: 2026-10-18 16:02:33.518744
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8b2f6e1c47'
+down_revision: Union[str, Sequence[str], None] = 'b3e7d1c9a465'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('messages', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('messages', 'version')
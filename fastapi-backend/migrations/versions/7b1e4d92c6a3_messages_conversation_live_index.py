@@ -0,0 +1,42 @@
+"""partial keyset index on messages (conversation_id, id)
+
+Revision ID: 7b1e4d92c6a3
+Revises: 3f9c2b7d41e8
+Create Date: 2026-10-18 11:02:07.540913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1e4d92c6a3'
+down_revision: Union[str, Sequence[str], None] = '3f9c2b7d41e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so large messages tables stay writable.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_messages_conversation_live',
+            'messages',
+            ['conversation_id', 'id'],
+            unique=False,
+            postgresql_where=sa.text('deleted_at IS NULL'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_messages_conversation_live',
+            table_name='messages',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,36 @@
+"""backplane events for oversized notifications
+
+Revision ID: 8c1f4a7e2d90
+Revises: a6198b02ddb1
+Create Date: 2026-10-18 17:40:21.093127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1f4a7e2d90'
+down_revision: Union[str, Sequence[str], None] = 'a6198b02ddb1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('backplane_events',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('topic', sa.String(length=255), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_backplane_events_created_at', 'backplane_events', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_backplane_events_created_at', table_name='backplane_events')
+    op.drop_table('backplane_events')
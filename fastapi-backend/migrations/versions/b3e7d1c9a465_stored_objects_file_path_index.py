@@ -0,0 +1,27 @@
+"""stored objects lookup by file path
+
+Revision ID: b3e7d1c9a465
+Revises: 0a9e5d3c7b21
+Create Date: 2026-10-18 18:05:47.512390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e7d1c9a465'
+down_revision: Union[str, Sequence[str], None] = '0a9e5d3c7b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_stored_objects_storage_file_path', 'stored_objects', ['storage', 'file_path'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stored_objects_storage_file_path', table_name='stored_objects')
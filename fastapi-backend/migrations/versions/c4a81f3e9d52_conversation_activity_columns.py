@@ -0,0 +1,64 @@
+"""conversation activity columns with backfill
+
+Revision ID: c4a81f3e9d52
+Revises: 7b1e4d92c6a3
+Create Date: 2026-10-18 12:20:55.804126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a81f3e9d52'
+down_revision: Union[str, Sequence[str], None] = '7b1e4d92c6a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('conversations', sa.Column('last_message_id', sa.Integer(), nullable=True))
+    op.add_column('conversations', sa.Column('last_message_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('conversations', sa.Column('message_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute(
+        """
+        UPDATE conversations AS c
+        SET message_count = s.message_count,
+            last_message_id = s.last_message_id,
+            last_message_at = m.created_at
+        FROM (
+            SELECT conversation_id, count(*) AS message_count, max(id) AS last_message_id
+            FROM messages
+            WHERE deleted_at IS NULL
+            GROUP BY conversation_id
+        ) AS s
+        JOIN messages AS m ON m.id = s.last_message_id
+        WHERE c.id = s.conversation_id
+        """
+    )
+
+    op.create_index(
+        'ix_conversations_user1_activity',
+        'conversations',
+        ['user1_id', sa.text('coalesce(last_message_at, created_at) DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    op.create_index(
+        'ix_conversations_user2_activity',
+        'conversations',
+        ['user2_id', sa.text('coalesce(last_message_at, created_at) DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_conversations_user2_activity', table_name='conversations')
+    op.drop_index('ix_conversations_user1_activity', table_name='conversations')
+    op.drop_column('conversations', 'message_count')
+    op.drop_column('conversations', 'last_message_at')
+    op.drop_column('conversations', 'last_message_id')
@@ -0,0 +1,46 @@
+"""conversation read high-water marks
+
+Revision ID: e2d5a9b7f013
+Revises: c4a81f3e9d52
+Create Date: 2026-10-18 13:05:12.418390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2d5a9b7f013'
+down_revision: Union[str, Sequence[str], None] = 'c4a81f3e9d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('conversation_reads',
+    sa.Column('conversation_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('last_read_message_id', sa.Integer(), nullable=False),
+    sa.Column('read_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('conversation_id', 'user_id', name='pk_conversation_reads')
+    )
+
+    op.execute(
+        """
+        INSERT INTO conversation_reads (conversation_id, user_id, last_read_message_id, read_at)
+        SELECT m.conversation_id, r.user_id, MAX(r.message_id), MAX(r.read_at)
+        FROM message_reads AS r
+        JOIN messages AS m ON m.id = r.message_id
+        GROUP BY m.conversation_id, r.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('conversation_reads')
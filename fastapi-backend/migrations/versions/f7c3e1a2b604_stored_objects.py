@@ -0,0 +1,37 @@
+"""content-addressed stored objects
+
+Revision ID: f7c3e1a2b604
+Revises: e2d5a9b7f013
+Create Date: 2026-10-18 14:31:47.902215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c3e1a2b604'
+down_revision: Union[str, Sequence[str], None] = 'e2d5a9b7f013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stored_objects',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('storage', sa.String(length=20), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('mime_type', sa.String(length=100), nullable=True),
+    sa.Column('file_path', sa.String(length=1024), nullable=False),
+    sa.Column('provider_id', sa.String(length=1024), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.PrimaryKeyConstraint('sha256', 'storage', name='pk_stored_objects')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('stored_objects')
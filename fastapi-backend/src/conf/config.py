@@ -5,12 +5,33 @@ from typing import Optional
 
 class Settings(BaseSettings):
     DB_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg prepared statement cache per connection (0 for pgbouncer)
+    DB_STATEMENT_CACHE_SIZE: int = 100
 
     # JWT
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     ALGORITHM: str = "HS256"
     SECRET_KEY: str
+    # Sent as X-Internal-Token to reach /internal/*; unset disables them
+    INTERNAL_API_TOKEN: Optional[str] = None
+
+    # Per-process cache of users resolved from access tokens
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+    # Conversation participants, used for membership checks on REST and WS
+    MEMBERSHIP_CACHE_TTL_SECONDS: int = 3600
+    MEMBERSHIP_CACHE_NEGATIVE_TTL_SECONDS: int = 5
+    MEMBERSHIP_CACHE_MAX_SIZE: int = 50000
+
+    # bcrypt runs in a dedicated pool; extra requests beyond the cap get 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
 
     CLOUDINARY_URL: Optional[str] = None
     CLD_NAME: Optional[str] = None
@@ -18,7 +39,55 @@ class Settings(BaseSettings):
     CLD_API_SECRET: Optional[str] = None
 
     MAX_UPLOAD_MB: int = 20
+    # Whole multipart body of one upload request, enforced while it is read
+    MAX_UPLOAD_REQUEST_MB: int = 100
     ALLOWED_MIME: str = "image/png,image/jpeg,application/pdf,text/plain"
+    # Uploads are spooled to disk and streamed to storage in chunks
+    UPLOAD_CONCURRENCY: int = 4
+    UPLOAD_CHUNK_MB: int = 6
+    UPLOAD_SPOOL_DIR: Optional[str] = None
+    # Lifetime of signed parameters for direct-to-storage uploads
+    UPLOAD_PRESIGN_TTL_SECONDS: int = 900
+
+    # Image thumbnails/LQIP rendered in a process pool (0 workers disables)
+    PREVIEW_WORKERS: int = 2
+    PREVIEW_SIZES: str = "160,480"
+    PREVIEW_MAX_PENDING: int = 32
+
+    # Where uploads are stored: "cloudinary", "local" or "s3"
+    STORAGE_BACKEND: str = "cloudinary"
+    LOCAL_STORAGE_DIR: str = "media"
+    LOCAL_STORAGE_URL: str = "/media"
+    S3_BUCKET: Optional[str] = None
+    S3_ENDPOINT_URL: Optional[str] = None
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    S3_PUBLIC_URL: Optional[str] = None
+
+    # WebSocket fan-out: "memory" (single process) or "postgres" (LISTEN/NOTIFY)
+    WS_BACKPLANE: str = "memory"
+    WS_BACKPLANE_CHANNEL: str = "ws_broadcast"
+    # Outbound frames buffered per socket; on overflow "drop_oldest" or "disconnect"
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_OVERFLOW_POLICY: str = "drop_oldest"
+
+    # Write-behind batching of inbound chat messages (one INSERT per batch)
+    MESSAGE_INGEST_BATCHING: bool = False
+    MESSAGE_INGEST_BATCH_SIZE: int = 200
+    MESSAGE_INGEST_BATCH_MS: float = 5
+    # Messages waiting for a batch; beyond this senders get an error
+    MESSAGE_INGEST_MAX_PENDING: int = 10000
+
+    # Recent messages per conversation served from memory (LRU across chats);
+    # only active with WS_BACKPLANE=postgres, which carries every worker's writes
+    HOT_TAIL_SIZE: int = 100
+    HOT_TAIL_MAX_MB: int = 64
+    HOT_TAIL_TTL_SECONDS: int = 300
+
+    # Read receipts are coalesced in memory and upserted in batches
+    READ_RECEIPT_FLUSH_MS: float = 1000
+    READ_RECEIPT_MAX_PENDING: int = 5000
 
     model_config = ConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=True, extra="ignore"
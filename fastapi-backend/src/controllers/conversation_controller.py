@@ -1,10 +1,24 @@
-from typing import List, cast
+from datetime import datetime
+from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, and_
+from sqlalchemy import (
+    DateTime,
+    Row,
+    select,
+    or_,
+    and_,
+    func,
+    literal,
+    true,
+    tuple_,
+    union_all,
+)
 from sqlalchemy.orm import aliased
 
+from src.conf.config import settings
 from src.controllers.base_controller import BaseController
-from src.models.chat_model import Conversation
+from src.core.cache import membership_cache
+from src.models.chat_model import Conversation, ConversationRead, Message
 from src.models.user_model import User
 
 
@@ -12,6 +26,57 @@ class ConversationController(BaseController):
     def __init__(self, session: AsyncSession):
         super().__init__(session, Conversation)
 
+    async def get_participants(self, conversation_id: int) -> Optional[Tuple[int, int]]:
+        res = await self.db.execute(
+            select(Conversation.user1_id, Conversation.user2_id).where(
+                Conversation.id == conversation_id
+            )
+        )
+        row = res.first()
+        return (row.user1_id, row.user2_id) if row else None
+
+    async def get_cached_participants(
+        self, conversation_id: int
+    ) -> Optional[Tuple[int, int]]:
+        participants = membership_cache.get(conversation_id)
+        if participants is None:
+            found = await self.get_participants(conversation_id)
+            if found:
+                membership_cache.set(conversation_id, found)
+            else:
+                membership_cache.set(
+                    conversation_id,
+                    (),
+                    ttl=settings.MEMBERSHIP_CACHE_NEGATIVE_TTL_SECONDS,
+                )
+            participants = found
+        return participants or None
+
+    async def is_member(self, conversation_id: int, user_id: int) -> bool:
+        participants = await self.get_cached_participants(conversation_id)
+        return bool(participants and user_id in participants)
+
+    async def get_last_message_id(self, conversation_id: int) -> Optional[int]:
+        res = await self.db.execute(
+            select(Conversation.last_message_id).where(
+                Conversation.id == conversation_id
+            )
+        )
+        return res.scalar_one_or_none()
+
+    async def delete(self, instance: Conversation) -> None:
+        conversation_id = instance.id
+        await super().delete(instance)
+        self.invalidate_cached(conversation_id)
+
+    @staticmethod
+    def invalidate_cached(conversation_id: int) -> None:
+        membership_cache.pop(conversation_id)
+
+    @staticmethod
+    def invalidate_cached_for_user(user_id: int) -> None:
+        membership_cache.pop_where(lambda p: user_id in p)
+
     async def list_for_user(
         self, user_id: int, *, limit: int = 50, offset: int = 0
     ) -> List[Conversation]:
@@ -27,30 +92,97 @@ class ConversationController(BaseController):
         res = await self.db.execute(stmt)
         return list(res.scalars().all())
 
-    async def list_for_user_with_peer(
-        self, user_id: int, *, limit: int = 50, offset: int = 0
-    ) -> List[tuple[Conversation, User]]:
-        user = aliased(User)
+    async def list_ids_for_user(self, user_id: int) -> List[int]:
+        stmt = select(Conversation.id).where(
+            or_(Conversation.user1_id == user_id, Conversation.user2_id == user_id)
+        )
+        res = await self.db.execute(stmt)
+        return list(res.scalars().all())
+
+    async def list_inbox(
+        self,
+        user_id: int,
+        *,
+        limit: int = 50,
+        offset: int = 0,
+        before: Optional[Tuple[datetime, int]] = None,
+    ) -> List[Row]:
+        peer = aliased(User, name="peer")
+        last_message = aliased(Message, name="last_message")
 
         on_clause = or_(
-            and_(Conversation.user1_id == user_id, user.id == Conversation.user2_id),
-            and_(Conversation.user2_id == user_id, user.id == Conversation.user1_id),
+            and_(Conversation.user1_id == user_id, peer.id == Conversation.user2_id),
+            and_(Conversation.user2_id == user_id, peer.id == Conversation.user1_id),
         )
 
-        stmt = (
-            select(Conversation, user)
-            .join(user, on_clause)
+        # Everything above the reader's high-water mark is unread; this is a
+        # range scan on ix_messages_conversation_live.
+        read_up_to = (
+            select(ConversationRead.last_read_message_id)
+            .where(
+                ConversationRead.conversation_id == Conversation.id,
+                ConversationRead.user_id == user_id,
+            )
+            .correlate_except(ConversationRead)
+            .scalar_subquery()
+        )
+        unread = (
+            select(func.count().label("unread_count"))
+            .select_from(Message)
             .where(
-                or_(
-                    Conversation.user1_id == user_id,
-                    Conversation.user2_id == user_id,
+                Message.conversation_id == Conversation.id,
+                Message.deleted_at.is_(None),
+                Message.id > func.coalesce(read_up_to, 0),
+                Message.sender_id != user_id,
+            )
+            .lateral("unread")
+        )
+
+        last_activity_at = func.coalesce(
+            Conversation.last_message_at, Conversation.created_at
+        )
+
+        # One ordered range scan per participant column (each backed by its
+        # activity index), merged and cut to the page size.
+        def _side(participant_column):
+            q = select(
+                Conversation.id.label("id"),
+                last_activity_at.label("activity"),
+            ).where(participant_column == user_id)
+            if before is not None:
+                before_at, before_id = before
+                q = q.where(
+                    tuple_(last_activity_at, Conversation.id)
+                    < tuple_(literal(before_at, DateTime(timezone=True)), before_id)
                 )
+            return q.order_by(last_activity_at.desc(), Conversation.id.desc()).limit(
+                limit + offset
             )
-            .order_by(Conversation.id.desc())
+
+        page = union_all(
+            _side(Conversation.user1_id), _side(Conversation.user2_id)
+        ).subquery("page")
+
+        stmt = (
+            select(
+                Conversation,
+                peer,
+                last_message.id.label("last_message_id"),
+                last_message.sender_id.label("last_message_sender_id"),
+                last_message.content.label("last_message_content"),
+                last_message.created_at.label("last_message_at"),
+                page.c.activity.label("last_activity_at"),
+                unread.c.unread_count,
+            )
+            .select_from(page)
+            .join(Conversation, Conversation.id == page.c.id)
+            .join(peer, on_clause)
+            .outerjoin(last_message, last_message.id == Conversation.last_message_id)
+            .join(unread, true())
+            .order_by(page.c.activity.desc(), page.c.id.desc())
             .limit(limit)
             .offset(offset)
         )
 
         res = await self.db.execute(stmt)
-        rows = cast(List[tuple[Conversation, User]], res.tuples().all())
-        return rows
+        return list(res.all())
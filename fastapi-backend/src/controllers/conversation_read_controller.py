@@ -0,0 +1,31 @@
+from typing import List
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.controllers.base_controller import BaseController
+from src.models.chat_model import ConversationRead
+
+
+class ConversationReadController(BaseController):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, ConversationRead)
+
+    async def upsert_many(self, rows: List[dict]) -> None:
+        if not rows:
+            return
+        stmt = insert(ConversationRead).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ConversationRead.conversation_id, ConversationRead.user_id],
+            set_={
+                "last_read_message_id": stmt.excluded.last_read_message_id,
+                "read_at": func.now(),
+            },
+            where=(
+                ConversationRead.last_read_message_id
+                < stmt.excluded.last_read_message_id
+            ),
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
@@ -1,10 +1,25 @@
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
-from sqlalchemy import select
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    any_,
+    bindparam,
+    case,
+    func,
+    insert,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from src.controllers.base_controller import BaseController
-from src.models.chat_model import Message
+from src.models.chat_model import Message, Attachment, Conversation, StoredObject
 
 
 class MessageController(BaseController):
@@ -17,6 +32,213 @@ class MessageController(BaseController):
         res = await self.db.execute(select(Message).where(Message.id.in_(ids)))
         return list(res.scalars().all())
 
+    async def create_with_attachments(
+        self, values: dict, attachments: List[dict]
+    ) -> Tuple[Message, List[Attachment]]:
+        created = await self.create_many_with_attachments([(values, attachments)])
+        return created[0]
+
+    async def create_many_with_attachments(
+        self, items: List[Tuple[dict, List[dict]]]
+    ) -> List[Tuple[Message, List[Attachment]]]:
+        if not items:
+            return []
+
+        res = await self.db.execute(
+            insert(Message).returning(Message, sort_by_parameter_order=True),
+            [values for values, _ in items],
+        )
+        msgs = list(res.scalars().all())
+
+        att_rows = [
+            {**a, "message_id": msg.id}
+            for msg, (_, attachments) in zip(msgs, items)
+            for a in attachments
+        ]
+        by_message: dict[int, List[Attachment]] = {}
+        if att_rows:
+            objects = await self._resolve_digests(att_rows)
+            res = await self.db.execute(
+                insert(Attachment).returning(Attachment, sort_by_parameter_order=True),
+                att_rows,
+            )
+            for att in res.scalars().all():
+                # Loaded here so the broadcast carries any existing previews.
+                set_committed_value(
+                    att, "stored_object", objects.get((att.storage, att.file_path))
+                )
+                by_message.setdefault(att.message_id, []).append(att)
+
+        await self._record_new_messages(msgs)
+        await self.db.commit()
+        return [(msg, by_message.get(msg.id, [])) for msg in msgs]
+
+    async def _resolve_digests(
+        self, att_rows: List[dict]
+    ) -> Dict[Tuple[str, str], StoredObject]:
+        # Link attachments to their stored bytes (and previews) by where the
+        # file lives, never by a digest the client claims.
+        keys = {(a["storage"], a["file_path"]) for a in att_rows}
+        res = await self.db.execute(
+            select(StoredObject).where(
+                tuple_(StoredObject.storage, StoredObject.file_path).in_(keys)
+            )
+        )
+        objects = {(obj.storage, obj.file_path): obj for obj in res.scalars()}
+        for a in att_rows:
+            obj = objects.get((a["storage"], a["file_path"]))
+            a["sha256"] = obj.sha256 if obj else None
+        return objects
+
+    async def _record_new_messages(self, msgs: List[Message]) -> None:
+        latest: Dict[int, Message] = {}
+        counts: Dict[int, int] = {}
+        for msg in msgs:
+            cid = msg.conversation_id
+            counts[cid] = counts.get(cid, 0) + 1
+            if cid not in latest or msg.id > latest[cid].id:
+                latest[cid] = msg
+
+        conv = Conversation.__table__
+        msg_id = bindparam("msg_id", type_=Integer)
+        msg_at = bindparam("msg_at", type_=DateTime(timezone=True))
+        # Guarded so a transaction that commits late never rewinds the pointer.
+        is_newer = or_(
+            conv.c.last_message_id.is_(None), conv.c.last_message_id < msg_id
+        )
+        stmt = (
+            update(conv)
+            .where(conv.c.id == bindparam("conv_id"))
+            .values(
+                message_count=conv.c.message_count + bindparam("added", type_=Integer),
+                last_message_at=case((is_newer, msg_at), else_=conv.c.last_message_at),
+                last_message_id=func.greatest(
+                    func.coalesce(conv.c.last_message_id, 0), msg_id
+                ),
+            )
+        )
+        # Sorted by id so concurrent batches lock conversation rows in order.
+        await self.db.execute(
+            stmt,
+            [
+                {
+                    "conv_id": cid,
+                    "added": counts[cid],
+                    "msg_id": latest[cid].id,
+                    "msg_at": latest[cid].created_at,
+                }
+                for cid in sorted(counts)
+            ],
+        )
+
+    async def update_content(
+        self,
+        message_id: int,
+        *,
+        sender_id: int,
+        content: str,
+        expected_version: int,
+    ) -> Optional[Message]:
+        stmt = (
+            update(Message)
+            .where(
+                Message.id == message_id,
+                Message.sender_id == sender_id,
+                Message.deleted_at.is_(None),
+                Message.version == expected_version,
+            )
+            .values(
+                content=content,
+                is_edited=True,
+                updated_at=func.now(),
+                version=Message.version + 1,
+            )
+            .returning(Message)
+            .execution_options(synchronize_session=False)
+        )
+        res = await self.db.execute(stmt)
+        msg = res.scalar_one_or_none()
+        await self.db.commit()
+        return msg
+
+    async def soft_delete_many(
+        self, ids: List[int], *, sender_id: int, deleted_at: datetime
+    ) -> List[Tuple[int, int]]:
+        stmt = (
+            update(Message)
+            .where(
+                Message.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))),
+                Message.sender_id == sender_id,
+                Message.deleted_at.is_(None),
+            )
+            .values(deleted_at=deleted_at)
+            .returning(Message.id, Message.conversation_id)
+            .execution_options(synchronize_session=False)
+        )
+        res = await self.db.execute(stmt)
+        return [(row.id, row.conversation_id) for row in res.all()]
+
+    async def get_senders(self, ids: List[int]) -> Dict[int, int]:
+        res = await self.db.execute(
+            select(Message.id, Message.sender_id).where(
+                Message.id == any_(bindparam("ids", ids, type_=ARRAY(Integer)))
+            )
+        )
+        return {row.id: row.sender_id for row in res.all()}
+
+    async def record_deleted_messages(self, deleted: Dict[int, List[int]]) -> None:
+        if not deleted:
+            return
+        conv = Conversation.__table__
+        last_live = (
+            select(Message.id, Message.created_at)
+            .where(
+                Message.conversation_id == conv.c.id,
+                Message.deleted_at.is_(None),
+            )
+            .order_by(Message.id.desc())
+            .limit(1)
+        )
+        # Recomputed only when the current last message was deleted. The
+        # check runs on the row as locked, so a send that commits while this
+        # waits keeps its (newer) pointer instead of being rewound to what
+        # the statement's snapshot can see.
+        was_last = conv.c.last_message_id == any_(
+            bindparam("ids", type_=ARRAY(Integer))
+        )
+        stmt = (
+            update(conv)
+            .where(conv.c.id == bindparam("conv_id"))
+            .values(
+                message_count=func.greatest(
+                    conv.c.message_count - bindparam("removed", type_=Integer), 0
+                ),
+                last_message_id=case(
+                    (
+                        was_last,
+                        last_live.with_only_columns(Message.id).scalar_subquery(),
+                    ),
+                    else_=conv.c.last_message_id,
+                ),
+                last_message_at=case(
+                    (
+                        was_last,
+                        last_live.with_only_columns(
+                            Message.created_at
+                        ).scalar_subquery(),
+                    ),
+                    else_=conv.c.last_message_at,
+                ),
+            )
+        )
+        await self.db.execute(
+            stmt,
+            [
+                {"conv_id": cid, "removed": len(ids), "ids": sorted(ids)}
+                for cid, ids in sorted(deleted.items())
+            ],
+        )
+
     async def list_for_conversation(
         self,
         conversation_id: int,
@@ -29,7 +251,9 @@ class MessageController(BaseController):
         stmt = (
             select(Message)
             .where(Message.conversation_id == conversation_id)
-            .options(selectinload(Message.attachments))
+            .options(
+                selectinload(Message.attachments).selectinload(Attachment.stored_object)
+            )
         )
         if not include_deleted:
             stmt = stmt.where(Message.deleted_at.is_(None))
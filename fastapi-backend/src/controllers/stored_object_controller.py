@@ -0,0 +1,35 @@
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.controllers.base_controller import BaseController
+from src.models.chat_model import StoredObject
+
+
+class StoredObjectController(BaseController):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, StoredObject)
+
+    async def get_by_digest(self, sha256: str, storage: str) -> Optional[StoredObject]:
+        res = await self.db.execute(
+            select(StoredObject).where(
+                StoredObject.sha256 == sha256, StoredObject.storage == storage
+            )
+        )
+        return res.scalar_one_or_none()
+
+    async def record(self, values: dict) -> None:
+        # A concurrent upload of the same bytes may have won; keep its row.
+        stmt = insert(StoredObject).values(values).on_conflict_do_nothing()
+        await self.db.execute(stmt)
+        await self.db.commit()
+
+    async def set_previews(self, sha256: str, storage: str, previews: dict) -> None:
+        await self.db.execute(
+            update(StoredObject)
+            .where(StoredObject.sha256 == sha256, StoredObject.storage == storage)
+            .values(previews=previews)
+        )
+        await self.db.commit()
@@ -3,6 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from src.controllers.base_controller import BaseController
+from src.controllers.conversation_controller import ConversationController
+from src.core.cache import user_cache
 from src.models.user_model import User
 from src.schemas.user_schema import UserSchema
 
@@ -18,6 +20,22 @@ class UserController(BaseController):
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_cached_user_by_username(self, username: str) -> User | None:
+        user = user_cache.get(("username", username))
+        if user is None:
+            user = await self.get_user_by_username(username)
+            if user:
+                user_cache.set(("username", username), user)
+        return user
+
+    async def get_cached_user_by_id(self, _id: int) -> User | None:
+        user = user_cache.get(("id", _id))
+        if user is None:
+            user = await self.get_user_by_id(_id)
+            if user:
+                user_cache.set(("id", _id), user)
+        return user
+
     async def get_user_by_email(self, email) -> User | None:
         stmt = select(self.model).filter_by(email=email)
         result = await self.db.execute(stmt)
@@ -34,3 +52,19 @@ class UserController(BaseController):
         stmt = select(self.model).filter_by(id=_id)
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
+
+    async def update(self, instance: User) -> User:
+        user = await super().update(instance)
+        self.invalidate_cached(user.id)
+        return user
+
+    async def delete(self, instance: User) -> None:
+        user_id = instance.id
+        await super().delete(instance)
+        self.invalidate_cached(user_id)
+        # The user's conversations are gone with them (ON DELETE CASCADE).
+        ConversationController.invalidate_cached_for_user(user_id)
+
+    @staticmethod
+    def invalidate_cached(user_id: int) -> None:
+        user_cache.pop_where(lambda u: u.id == user_id)
@@ -1,6 +1,11 @@
-from fastapi import Depends
+import hmac
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.conf.config import settings
+
 from src.database.db import get_db
 from src.services.auth_service import AuthService, oauth2_scheme
 from src.services.user_service import UserService
@@ -19,3 +24,16 @@ async def get_current_user(
     token: str = Depends(oauth2_scheme),
 ):
     return await auth_service.get_current_user(token)
+
+
+async def require_internal_token(
+    x_internal_token: Optional[str] = Header(None),
+):
+    # Operational endpoints stay hidden unless a token is configured.
+    expected = settings.INTERNAL_API_TOKEN
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_internal_token or not hmac.compare_digest(x_internal_token, expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid internal token"
+        )
@@ -1,21 +1,46 @@
 import contextlib
 import logging
 
+from sqlalchemy.engine import make_url
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine
 
 from src.conf.config import settings
+from src.database.pool import InstrumentedQueuePool
 
 logger = logging.getLogger("unicorn.error")
 
 
 class DatabaseSessionManager:
     def __init__(self, url: str):
-        self._engine: AsyncEngine = create_async_engine(url)
+        connect_args = {}
+        if make_url(url).get_driver_name() == "asyncpg":
+            # 0 disables both caches, as required behind pgbouncer.
+            connect_args = {
+                "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+                "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            }
+        self._engine: AsyncEngine = create_async_engine(
+            url,
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            connect_args=connect_args,
+        )
         self._session_maker: async_sessionmaker = async_sessionmaker(
             autoflush=False, expire_on_commit=False, autocommit=False, bind=self._engine
         )
 
+    @property
+    def engine(self) -> AsyncEngine:
+        return self._engine
+
+    def pool_stats(self) -> dict:
+        return self._engine.pool.stats()
+
     @contextlib.asynccontextmanager
     async def session(self):
         if self._session_maker is None:
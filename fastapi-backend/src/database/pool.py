@@ -0,0 +1,56 @@
+import bisect
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Upper bounds (ms) of the checkout wait histogram; the last bucket is open.
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.waiting = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_histogram = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def connect(self):
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.waiting -= 1
+        self._record_wait((time.perf_counter() - started) * 1000)
+        return conn
+
+    def _record_wait(self, waited_ms: float) -> None:
+        self.checkouts += 1
+        self.wait_total_ms += waited_ms
+        self.wait_max_ms = max(self.wait_max_ms, waited_ms)
+        self.wait_histogram[bisect.bisect_left(WAIT_BUCKETS_MS, waited_ms)] += 1
+
+    def stats(self) -> dict:
+        buckets = [f"<={b}ms" for b in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            # QueuePool starts overflow at -pool_size until the pool fills.
+            "overflow": max(0, self.overflow()),
+            "waiting": self.waiting,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": (
+                round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0
+            ),
+            "wait_max_ms": round(self.wait_max_ms, 3),
+            "wait_histogram": dict(zip(buckets, self.wait_histogram)),
+        }
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -6,25 +8,58 @@ from src.routers import (
     conversation_routers,
     upload_routers,
     message_routers,
+    internal_routers,
+    media_routers,
 )
 from src.sockets import routes
+from src.conf.config import settings
+from src.services.password_hasher import password_hasher
+from src.services.previews import preview_pipeline
+from src.services.read_receipts import read_receipts
+from src.sockets.hub import manager, ingest
+from src.storage.spool import UploadSizeLimit
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await manager.start()
+    await read_receipts.start()
+    if settings.MESSAGE_INGEST_BATCHING:
+        await ingest.start()
+    try:
+        yield
+    finally:
+        await ingest.stop()
+        await read_receipts.stop()
+        await preview_pipeline.stop()
+        await manager.stop()
+        password_hasher.shutdown()
 
 
-app = FastAPI(title="Messenger API", version="1.0.0")
+app = FastAPI(title="Messenger API", version="1.0.0", lifespan=lifespan)
 
+# Added first so CORS wraps it and rejections still carry CORS headers.
+app.add_middleware(
+    UploadSizeLimit,
+    paths={"/api/upload"},
+    max_bytes=settings.MAX_UPLOAD_REQUEST_MB * 1024 * 1024,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # You use your frontend URL
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(auth_routes.router, prefix="/api")
 app.include_router(conversation_routers.router, prefix="/api")
 app.include_router(upload_routers.router, prefix="/api")
 app.include_router(message_routers.router, prefix="/api")
+app.include_router(media_routers.router)
 app.include_router(routes.ws_router)
+app.include_router(internal_routers.router)
 
 
 @app.get("/health")
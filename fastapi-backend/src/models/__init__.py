@@ -1,5 +1,12 @@
 from .user_model import Base, User
-from .chat_model import Conversation, Message, Attachment, MessageRead
+from .chat_model import (
+    Conversation,
+    Message,
+    Attachment,
+    StoredObject,
+    MessageRead,
+    ConversationRead,
+)
 
 __all__ = [
     "Base",
@@ -7,5 +14,7 @@ __all__ = [
     "Conversation",
     "Message",
     "Attachment",
+    "StoredObject",
     "MessageRead",
+    "ConversationRead",
 ]
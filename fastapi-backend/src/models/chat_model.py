@@ -1,5 +1,6 @@
 from sqlalchemy import (
     func,
+    text,
     DateTime,
     ForeignKey,
     UniqueConstraint,
@@ -7,9 +8,12 @@ from sqlalchemy import (
     String,
     Boolean,
     Integer,
+    BigInteger,
+    Text,
     PrimaryKeyConstraint,
 )
 from datetime import datetime
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import List, Optional
 
@@ -28,6 +32,18 @@ class Conversation(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=func.current_date(), nullable=False
     )
+
+    # Maintained by the message send/delete paths so the inbox never has to
+    # scan messages. last_message_id is a plain pointer (no FK) to avoid a
+    # second join path between conversations and messages.
+    last_message_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    last_message_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    message_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+
     __table_args__ = (
         UniqueConstraint("user1_id", "user2_id", name="uq_conversation_pair"),
         Index("ix_conversations_users", "user1_id", "user2_id"),
@@ -40,6 +56,21 @@ class Conversation(Base):
     )
 
 
+# Inbox ordering (newest activity first) for each participant column.
+Index(
+    "ix_conversations_user1_activity",
+    Conversation.user1_id,
+    func.coalesce(Conversation.last_message_at, Conversation.created_at).desc(),
+    Conversation.id.desc(),
+)
+Index(
+    "ix_conversations_user2_activity",
+    Conversation.user2_id,
+    func.coalesce(Conversation.last_message_at, Conversation.created_at).desc(),
+    Conversation.id.desc(),
+)
+
+
 class Message(Base):
     __tablename__ = "messages"
 
@@ -65,10 +96,25 @@ class Message(Base):
         nullable=False,
     )
     is_edited: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    # Bumped on every edit; clients send it back to detect concurrent edits.
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1"
+    )
     deleted_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
 
+    __table_args__ = (
+        # Keyset pagination over live messages: WHERE conversation_id = ?
+        # AND deleted_at IS NULL ORDER BY id, bounded by before_id/after_id.
+        Index(
+            "ix_messages_conversation_live",
+            "conversation_id",
+            "id",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
+
     conversation = relationship("Conversation", back_populates="messages")
     attachments: Mapped[List["Attachment"]] = relationship(
         "Attachment",
@@ -92,12 +138,44 @@ class Attachment(Base):
 
     storage: Mapped[str] = mapped_column(String(20), nullable=False, default="local")
     file_path: Mapped[str] = mapped_column(String(1024), nullable=False)
+    sha256: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
 
     uploaded_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.current_timestamp(), nullable=False
     )
 
     message = relationship("Message", back_populates="attachments")
+    stored_object: Mapped[Optional["StoredObject"]] = relationship(
+        "StoredObject",
+        primaryjoin="and_(foreign(Attachment.sha256) == StoredObject.sha256, "
+        "foreign(Attachment.storage) == StoredObject.storage)",
+        viewonly=True,
+        lazy="raise",
+    )
+
+
+class StoredObject(Base):
+    # Content-addressed index of uploaded bytes, so identical files are
+    # stored once per backend and later uploads reuse the existing object.
+    __tablename__ = "stored_objects"
+
+    sha256: Mapped[str] = mapped_column(String(64))
+    storage: Mapped[str] = mapped_column(String(20))
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    mime_type: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    file_path: Mapped[str] = mapped_column(String(1024), nullable=False)
+    provider_id: Mapped[Optional[str]] = mapped_column(String(1024), nullable=True)
+    # {"thumbnails": [{"size", "url", "width", "height"}], "lqip": data URI},
+    # filled in by the preview pipeline after the upload has returned.
+    previews: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.current_timestamp(), nullable=False
+    )
+
+    __table_args__ = (
+        PrimaryKeyConstraint("sha256", "storage", name="pk_stored_objects"),
+        Index("ix_stored_objects_storage_file_path", "storage", "file_path"),
+    )
 
 
 class MessageRead(Base):
@@ -114,3 +192,39 @@ class MessageRead(Base):
     __table_args__ = (
         PrimaryKeyConstraint("message_id", "user_id", name="pk_message_reads"),
     )
+
+
+class ConversationRead(Base):
+    # Per-reader high-water mark: everything up to last_read_message_id in
+    # the conversation is read. One row per (conversation, user).
+    __tablename__ = "conversation_reads"
+
+    conversation_id: Mapped[int] = mapped_column(
+        ForeignKey("conversations.id", ondelete="CASCADE")
+    )
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    last_read_message_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    read_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.current_timestamp(), nullable=False
+    )
+
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            "conversation_id", "user_id", name="pk_conversation_reads"
+        ),
+    )
+
+
+class BackplaneEvent(Base):
+    # Socket events too large for a NOTIFY payload; listeners receive the id
+    # and read the row. Pruned by the publisher after a few minutes.
+    __tablename__ = "backplane_events"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    topic: Mapped[str] = mapped_column(String(255), nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.current_timestamp(), nullable=False
+    )
+
+    __table_args__ = (Index("ix_backplane_events_created_at", "created_at"),)
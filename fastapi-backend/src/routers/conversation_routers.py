@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
@@ -8,38 +8,22 @@ from src.schemas.conversation import (
     ConversationOut,
     ConversationCreate,
     ConversationWithPeerOut,
+    LastMessageOut,
     UserLiteOut,
 )
-from src.schemas.message import MessageWithAttachmentsOut, AttachmentOut
-from src.services.conversation_service import ConversationService
+from src.schemas.message import MessageWithAttachmentsOut, ReadUpToIn
+from src.services.conversation_service import (
+    ConversationService,
+    decode_cursor,
+    encode_cursor,
+)
 from src.services.message_service import MessageService
+from src.sockets import events
+from src.sockets.hub import manager
 
 router = APIRouter(prefix="/conversations", tags=["conversation"])
 
 
-def _to_out(m) -> MessageWithAttachmentsOut:
-    return MessageWithAttachmentsOut(
-        id=m.id,
-        conversation_id=m.conversation_id,
-        sender_id=m.sender_id,
-        content=m.content,
-        is_edited=m.is_edited,
-        deleted=m.deleted_at is not None,
-        created_at=m.created_at.isoformat() if m.created_at else "",
-        attachments=[
-            AttachmentOut(
-                id=a.id,
-                file_name=a.file_name,
-                mime_type=a.mime_type,
-                size_bytes=a.size_bytes,
-                storage=a.storage,
-                file_path=a.file_path,
-            )
-            for a in (m.attachments or [])
-        ],
-    )
-
-
 @router.post("", response_model=ConversationOut)
 async def get_or_create_conversation(
     payload: ConversationCreate,
@@ -48,6 +32,8 @@ async def get_or_create_conversation(
 ):
     svc = ConversationService(db)
     conv = await svc.get_or_create(current_user.id, payload.partner_id)
+    for user_id in (conv.user1_id, conv.user2_id):
+        await manager.subscribe_user(user_id, conv.id)
     return ConversationOut(id=conv.id, user1_id=conv.user1_id, user2_id=conv.user2_id)
 
 
@@ -63,30 +49,70 @@ async def list_messages(
     current_user=Depends(get_current_user),
 ):
     svc = MessageService(db)
-    items = await svc.list_messages(
+    return await svc.list_messages(
         conversation_id=conversation_id,
         user_id=current_user.id,
         limit=limit,
         before_id=before_id,
         after_id=after_id,
     )
-    return [_to_out(m) for m in items]
+
+
+@router.post("/{conversation_id}/read", status_code=204)
+async def mark_read(
+    conversation_id: int,
+    payload: ReadUpToIn,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    svc = MessageService(db)
+    marked = await svc.mark_read(
+        conversation_id=conversation_id,
+        user_id=current_user.id,
+        message_id=payload.message_id,
+    )
+    if marked is not None:
+        await manager.broadcast(
+            conversation_id,
+            events.read_receipt(conversation_id, current_user.id, marked),
+        )
+    return Response(status_code=204)
 
 
 @router.get("", response_model=List[ConversationWithPeerOut])
 async def list_conversations(
+    response: Response,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of prev page"),
     db: AsyncSession = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
     svc = ConversationService(db)
-    rows = await svc.list_for_user_with_peer(
-        user_id=current_user.id, limit=limit, offset=offset
+    before = decode_cursor(cursor) if cursor else None
+    rows = await svc.list_inbox(
+        user_id=current_user.id,
+        limit=limit,
+        offset=0 if before else offset,
+        before=before,
     )
+    if len(rows) == limit:
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            last.last_activity_at, last.Conversation.id
+        )
 
     out: List[ConversationWithPeerOut] = []
-    for conv, peer in rows:
+    for row in rows:
+        conv, peer = row.Conversation, row.peer
+        last_message = None
+        if row.last_message_id is not None:
+            last_message = LastMessageOut(
+                id=row.last_message_id,
+                sender_id=row.last_message_sender_id,
+                content=row.last_message_content,
+                created_at=row.last_message_at,
+            )
         out.append(
             ConversationWithPeerOut(
                 id=conv.id,
@@ -98,6 +124,9 @@ async def list_conversations(
                     username=getattr(peer, "username", None),
                     email=getattr(peer, "email", None),
                 ),
+                last_message=last_message,
+                last_activity_at=row.last_activity_at,
+                unread_count=row.unread_count,
             )
         )
     return out
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends
+
+from src.core.cache import membership_cache, user_cache
+from src.core.depend_service import require_internal_token
+from src.database.db import session_manager
+from src.services.message_tail import message_tail
+from src.services.password_hasher import password_hasher
+from src.services.previews import preview_pipeline
+from src.services.read_receipts import read_receipts
+from src.services.upload_service import upload_service
+from src.sockets.hub import manager, ingest
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    dependencies=[Depends(require_internal_token)],
+)
+
+
+@router.get("/ws/stats")
+async def ws_stats():
+    return manager.stats()
+
+
+@router.get("/ingest/stats")
+async def ingest_stats():
+    return ingest.stats()
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    return {
+        "users": user_cache.stats(),
+        "memberships": membership_cache.stats(),
+        "message_tail": message_tail.stats(),
+    }
+
+
+@router.get("/auth/hasher")
+async def hasher_stats():
+    return password_hasher.stats()
+
+
+@router.get("/reads/stats")
+async def read_receipt_stats():
+    return read_receipts.stats()
+
+
+@router.get("/uploads/stats")
+async def upload_stats():
+    return upload_service.stats()
+
+
+@router.get("/previews/stats")
+async def preview_stats():
+    return preview_pipeline.stats()
+
+
+@router.get("/db/pool")
+async def db_pool_stats():
+    return session_manager.pool_stats()
@@ -0,0 +1,44 @@
+import os
+from stat import S_ISREG
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+
+from src.conf.config import settings
+from src.storage.backends import storage
+from src.storage.local_storage import LocalStorage
+
+# Served where LocalStorage points its URLs; a prefix of "" would shadow
+# every other route, so a URL without a path falls back to /media.
+router = APIRouter(
+    prefix=urlsplit(settings.LOCAL_STORAGE_URL).path.rstrip("/") or "/media",
+    tags=["media"],
+)
+
+
+@router.get("/{key:path}")
+async def get_media(key: str, request: Request):
+    path = storage.resolve(key) if isinstance(storage, LocalStorage) else None
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    try:
+        stat = await run_in_threadpool(os.stat, path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    if not S_ISREG(stat.st_mode):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+
+    # Object keys are never reused, so the file behind a URL never changes.
+    etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+    headers = {
+        "etag": etag,
+        "cache-control": "public, max-age=31536000, immutable",
+    }
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # FileResponse handles Range requests and uses the server's sendfile/
+    # pathsend support when available.
+    return FileResponse(path, headers=headers, stat_result=stat)
@@ -1,14 +1,31 @@
+import asyncio
+
 from fastapi import APIRouter, Depends, UploadFile, File, Form
 from typing import List, Dict, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
 from src.core.depend_service import get_current_user
-from src.storage.cloudinary_adapter import cloudinary_upload
+from src.schemas.upload import CompleteUploadIn, PresignIn, PresignOut
+from src.services.upload_service import upload_service
 
 router = APIRouter(prefix="/upload", tags=["upload"])
 
 
+def _to_out(meta: Dict) -> Dict:
+    return {
+        "file_path": meta["file_path"],
+        "file_name": meta["file_name"],
+        "mime": meta["mime"],
+        "size_bytes": meta["size_bytes"],
+        "storage": meta["storage"],
+        "provider_id": meta["provider_id"],
+        "sha256": meta["sha256"],
+        "thumbnails": meta["thumbnails"],
+        "lqip": meta["lqip"],
+    }
+
+
 @router.post("", response_model=List[Dict])
 async def upload_file(
     files: List[UploadFile] = File(..., description="1..N files"),
@@ -18,18 +35,55 @@ async def upload_file(
 ):
     target_folder = folder or f"users/{current_user.id}"
 
-    out: List[Dict] = []
-    for f in files:
-        meta = await cloudinary_upload(f, folder=target_folder)
-        out.append(
-            {
-                "file_path": meta["file_path"],
-                "file_name": meta["file_name"],
-                "mime": meta["mime"],
-                "size_bytes": meta["size_bytes"],
-                "storage": meta["storage"],
-                "provider_id": meta["provider_id"],
-            }
-        )
-
-    return out
+    # Files upload concurrently; the service bounds how many run at once.
+    # A failed file cancels its siblings instead of leaving them running.
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(upload_service.upload(f, folder=target_folder))
+                for f in files
+            ]
+    except ExceptionGroup as eg:
+        raise eg.exceptions[0]
+
+    return [_to_out(task.result()) for task in tasks]
+
+
+@router.get("/objects/{sha256}", response_model=Dict)
+async def find_uploaded_object(
+    sha256: str,
+    current_user=Depends(get_current_user),
+):
+    # Knowing a digest is not proof of holding the bytes, so this only says
+    # whether an upload would be deduplicated, never where the object lives.
+    meta = await upload_service.find(sha256)
+    return {"sha256": sha256.strip().lower(), "exists": meta is not None}
+
+
+# Direct uploads: the client sends bytes straight to storage with the signed
+# fields, then calls /complete so the object is checked before it is used.
+@router.post("/presign", response_model=PresignOut)
+async def presign_upload(
+    payload: PresignIn,
+    current_user=Depends(get_current_user),
+):
+    return await upload_service.presign(
+        user_id=current_user.id,
+        file_name=payload.file_name,
+        mime=payload.mime,
+        size_bytes=payload.size_bytes,
+    )
+
+
+@router.post("/complete", response_model=Dict)
+async def complete_upload(
+    payload: CompleteUploadIn,
+    current_user=Depends(get_current_user),
+):
+    meta = await upload_service.complete(
+        user_id=current_user.id,
+        provider_id=payload.provider_id,
+        file_name=payload.file_name,
+        mime=payload.mime,
+    )
+    return _to_out(meta)
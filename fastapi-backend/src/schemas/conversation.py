@@ -23,5 +23,15 @@ class UserLiteOut(BaseModel):
     email: Optional[str] = None
 
 
+class LastMessageOut(BaseModel):
+    id: int
+    sender_id: int
+    content: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
 class ConversationWithPeerOut(ConversationOut):
     peer: Optional[UserLiteOut] = None
+    last_message: Optional[LastMessageOut] = None
+    last_activity_at: Optional[datetime] = None
+    unread_count: int = 0
@@ -6,6 +6,7 @@ IdsList = Annotated[List[int], Field(min_length=1, description="At least one id"
 
 class MessageEditIn(BaseModel):
     content: str = Field(..., min_length=1)
+    version: int = Field(..., ge=1, description="Version being edited")
 
 
 class MessageOut(BaseModel):
@@ -15,12 +16,24 @@ class MessageOut(BaseModel):
     content: str | None
     is_edited: bool
     deleted: bool
+    version: int
 
 
 class BulkDeleteIn(BaseModel):
     ids: IdsList
 
 
+class ReadUpToIn(BaseModel):
+    message_id: int = Field(..., gt=0)
+
+
+class ThumbnailOut(BaseModel):
+    size: int
+    url: str
+    width: int
+    height: int
+
+
 class AttachmentOut(BaseModel):
     id: int
     file_name: str
@@ -28,6 +41,8 @@ class AttachmentOut(BaseModel):
     size_bytes: int | None
     storage: str
     file_path: str
+    thumbnails: List[ThumbnailOut] = Field(default_factory=list)
+    lqip: str | None = None
 
 
 class MessageWithAttachmentsOut(BaseModel):
@@ -37,5 +52,6 @@ class MessageWithAttachmentsOut(BaseModel):
     content: str | None
     is_edited: bool
     deleted: bool
+    version: int = 1
     created_at: str
     attachments: List[AttachmentOut] = Field(default_factory=list)
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+
+
+class PresignIn(BaseModel):
+    file_name: str = Field(..., min_length=1, max_length=255)
+    mime: str = Field(..., min_length=1, max_length=100)
+    size_bytes: int = Field(..., gt=0)
+
+
+class PresignOut(BaseModel):
+    url: str
+    fields: dict
+    provider_id: str
+    expires_in: int
+
+
+class CompleteUploadIn(BaseModel):
+    provider_id: str = Field(..., min_length=1, max_length=1024)
+    file_name: str = Field(..., min_length=1, max_length=255)
+    mime: str = Field(..., min_length=1, max_length=100)
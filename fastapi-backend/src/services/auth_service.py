@@ -2,7 +2,6 @@ import jwt
 from fastapi import HTTPException, status, Request, Response, Depends
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-import bcrypt
 from datetime import datetime
 
 from src.conf.config import settings
@@ -10,6 +9,7 @@ from src.controllers.user_controller import UserController
 from src.controllers.refresh_roken_controller import RefreshTokenController
 from src.schemas.user_schema import UserSchema, AuthResponse
 from src.models.user_model import User
+from src.services.password_hasher import password_hasher
 from src.services.refresh_token_service import RefreshTokenService
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
@@ -21,13 +21,16 @@ class AuthService:
         self.user_controller = UserController(self.db)
         self.refresh_token_service = RefreshTokenService(self.db)
 
-    def _hash_password(self, password: str) -> str:
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(password.encode("utf-8"), salt)
-        return hashed_password.decode("utf-8")
+    async def _hash_password(self, password: str) -> str:
+        return await password_hasher.hash(password)
 
-    def _verify_password(self, password: str, hashed_password: str) -> bool:
-        return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+    async def _verify_password(self, password: str, hashed_password: str) -> bool:
+        return await password_hasher.verify(password, hashed_password)
+
+    async def _release_connection(self) -> None:
+        # Only reads so far; ending the transaction hands the connection back
+        # to the pool while bcrypt runs, which can queue for seconds.
+        await self.db.commit()
 
     async def register_user(self, user: UserSchema) -> tuple[str, str, datetime]:
         exist_username = await self.user_controller.get_user_by_username(user.username)
@@ -42,11 +45,12 @@ class AuthService:
                 status_code=status.HTTP_409_CONFLICT, detail="Email already exists"
             )
 
-        hashed_password = self._hash_password(user.password)
+        await self._release_connection()
+        hashed_password = await self._hash_password(user.password)
         created_user = await self.user_controller.create_user(user, hashed_password)
 
         access_token = await self.refresh_token_service.create_access_token(
-            created_user.username
+            created_user.username, created_user.id
         )
 
         refresh_raw, refresh_expires = (
@@ -61,13 +65,14 @@ class AuthService:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
             )
-        if not self._verify_password(password, user.hashed_password):
+        await self._release_connection()
+        if not await self._verify_password(password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
             )
 
         access_token = await self.refresh_token_service.create_access_token(
-            user.username
+            user.username, user.id
         )
         refresh_raw, refresh_expires = (
             await self.refresh_token_service.create_refresh_token(user.id)
@@ -89,12 +94,17 @@ class AuthService:
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
             )
 
+        user_id = payload.get("uid")
         username = payload.get("sub")
-        if not username:
+        if isinstance(user_id, int):
+            user = await self.user_controller.get_cached_user_by_id(user_id)
+        elif username:
+            # Tokens issued before "uid" was added only carry the username.
+            user = await self.user_controller.get_cached_user_by_username(username)
+        else:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
             )
-        user = await self.user_controller.get_user_by_username(username)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -1,13 +1,33 @@
+import base64
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from sqlalchemy import select
-from typing import List, Tuple, cast
+from sqlalchemy import Row, select
+from datetime import datetime
+from typing import List, Optional, Tuple
 
 from src.controllers.conversation_controller import ConversationController
 from src.models.chat_model import Conversation
 from src.models.user_model import User
 
 
+def encode_cursor(last_activity_at: datetime, conversation_id: int) -> str:
+    raw = f"{last_activity_at.isoformat()}|{conversation_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        activity, conversation_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(activity), int(conversation_id)
+    except (ValueError, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
 class ConversationService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -42,15 +62,20 @@ class ConversationService:
         self.db.add(conv)
         await self.db.commit()
         await self.db.refresh(conv)
+        self.conversation_controller.invalidate_cached(conv.id)
         return conv
 
-    async def list_for_user_with_peer(
-        self, user_id: int, *, limit: int = 50, offset: int = 0
-    ) -> List[tuple[Conversation, User]]:
-        rows = await self.conversation_controller.list_for_user_with_peer(
-            user_id, limit=limit, offset=offset
+    async def list_inbox(
+        self,
+        user_id: int,
+        *,
+        limit: int = 50,
+        offset: int = 0,
+        before: Optional[Tuple[datetime, int]] = None,
+    ) -> List[Row]:
+        return await self.conversation_controller.list_inbox(
+            user_id, limit=limit, offset=offset, before=before
         )
-        return cast(List[tuple[Conversation, User]], rows)
 
     async def list_for_user(
         self, user_id: int, *, limit: int = 50, offset: int = 0
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from src.controllers.message_controller import MessageController
+from src.database.db import session_manager
+from src.models.chat_model import Attachment, Message
+
+logger = logging.getLogger("uvicorn.error")
+
+Persisted = Tuple[Message, List[Attachment]]
+OnPersisted = Callable[[Message, List[Attachment]], Awaitable[None]]
+
+
+class MessageIngest:
+    def __init__(
+        self,
+        *,
+        max_batch: int,
+        max_delay_ms: float,
+        max_pending: int,
+        on_persisted: Optional[OnPersisted] = None,
+    ):
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max(0.0, max_delay_ms) / 1000
+        self.max_pending = max(1, max_pending)
+        self.on_persisted = on_persisted
+        self.batches = 0
+        self.messages = 0
+        self.rejected = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending)
+        self._worker: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def start(self) -> None:
+        if self._worker is None:
+            self._stopping = False
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        # The sentinel lets the worker persist everything accepted before it.
+        self._stopping = True
+        await self._queue.put(None)
+        await self._worker
+        self._worker = None
+
+    async def submit(self, values: dict, attachments: List[dict]) -> Persisted:
+        # Resolves only after the batch holding this message has committed and
+        # been handed to on_persisted, so the sender's ack implies durability.
+        if self._worker is None or self._worker.done() or self._stopping:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Message ingest is not running",
+            )
+        fut = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((values, attachments, fut))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many messages in flight, retry later",
+            )
+        return await fut
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list) -> None:
+        if not batch:
+            return
+        try:
+            results = await self._persist([(v, a) for v, a, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                self._resolve(batch[0][2], error=e)
+                return
+            # One bad row must not fail its neighbours: retry one by one.
+            logger.warning(f"Message batch insert failed, retrying singly: {e}")
+            for item in batch:
+                await self._flush([item])
+            return
+
+        self.batches += 1
+        self.messages += len(batch)
+        # Broadcast in insertion order to keep per-conversation ordering.
+        for (_, _, fut), (msg, atts) in zip(batch, results):
+            if self.on_persisted:
+                try:
+                    await self.on_persisted(msg, atts)
+                except Exception as e:
+                    logger.error(f"Message ingest callback failed: {e}", exc_info=True)
+            self._resolve(fut, result=(msg, atts))
+
+    async def _persist(self, items: List[Tuple[dict, List[dict]]]) -> List[Persisted]:
+        async with session_manager.session() as db:
+            return await MessageController(db).create_many_with_attachments(items)
+
+    @staticmethod
+    def _resolve(fut: asyncio.Future, *, result=None, error=None) -> None:
+        if fut.done():
+            return
+        if error is not None:
+            fut.set_exception(error)
+        else:
+            fut.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "messages": self.messages,
+        }
@@ -1,12 +1,15 @@
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from datetime import datetime, timezone
-from typing import Dict, List, Any, Iterable, Optional
+from typing import Dict, List, Any, Iterable, Optional, Tuple
 
+from src.controllers.conversation_controller import ConversationController
 from src.controllers.message_controller import MessageController
-from src.models.chat_model import Message, Conversation
+from src.models.chat_model import Message, Attachment
+from src.services.message_tail import message_tail
+from src.services.read_receipts import read_receipts
+from src.sockets import events
 
 
 def _normalize_ids(raw_ids: Iterable[Any]) -> List[int]:
@@ -21,76 +24,183 @@ def _normalize_ids(raw_ids: Iterable[Any]) -> List[int]:
     return sorted(out)
 
 
+def _normalize_attachments(raw_atts: Any) -> List[dict]:
+    if not isinstance(raw_atts, list):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid attachments",
+        )
+    out: List[dict] = []
+    for a in raw_atts:
+        if not isinstance(a, dict) or not a.get("file_path"):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Invalid attachment",
+            )
+        out.append(
+            {
+                "file_name": a.get("file_name") or "file",
+                "mime_type": a.get("mime"),
+                "size_bytes": a.get("size_bytes"),
+                "storage": a.get("storage") or "cloudinary",
+                "file_path": a["file_path"],
+            }
+        )
+    return out
+
+
+def build_message(
+    *,
+    conversation_id: int,
+    sender_id: int,
+    content: Optional[str],
+    attachments: Any = None,
+    reply_to_id: Any = None,
+) -> Tuple[dict, List[dict]]:
+    content = (content or "").strip()
+    normalized_atts = _normalize_attachments(attachments or [])
+    if not content and not normalized_atts:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Content or attachments required",
+        )
+    if reply_to_id is not None and not isinstance(reply_to_id, int):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid reply_to_id",
+        )
+
+    values = {
+        "conversation_id": conversation_id,
+        "sender_id": sender_id,
+        "content": content or None,
+        "created_at": datetime.now(timezone.utc),
+        "reply_to_id": reply_to_id,
+    }
+    return values, normalized_atts
+
+
+def message_out(msg: Message) -> dict:
+    return events.message_with_attachments(msg, msg.attachments)
+
+
 class MessageService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.message_controller = MessageController(self.db)
+        self.conversation_controller = ConversationController(self.db)
+
+    async def send_message(
+        self,
+        *,
+        conversation_id: int,
+        sender_id: int,
+        content: Optional[str],
+        attachments: Any = None,
+        reply_to_id: Any = None,
+    ) -> Tuple[Message, List[Attachment]]:
+        values, normalized_atts = build_message(
+            conversation_id=conversation_id,
+            sender_id=sender_id,
+            content=content,
+            attachments=attachments,
+            reply_to_id=reply_to_id,
+        )
+        return await self.message_controller.create_with_attachments(
+            values, normalized_atts
+        )
 
     async def edit_message(
-        self, *, current_user_id: int, message_id: int, content: str
+        self,
+        *,
+        current_user_id: int,
+        message_id: int,
+        content: str,
+        expected_version: int,
     ) -> Message:
-        msg = await self.message_controller.get_by_id(message_id)
-        if not msg or msg.deleted_at is not None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Message not found"
-            )
-        if msg.sender_id != current_user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN, detail="Not the author"
-            )
-
         new_content = (content or "").strip()
         if not new_content:
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Empty content"
             )
 
-        msg.content = new_content
-        msg.is_edited = True
-        msg.updated_at = datetime.now(timezone.utc)
-
-        await self.message_controller.update(msg)
+        msg = await self.message_controller.update_content(
+            message_id,
+            sender_id=current_user_id,
+            content=new_content,
+            expected_version=expected_version,
+        )
+        if msg is not None:
+            return msg
 
-        return msg
+        # Nothing matched; work out why only on this (rare) path.
+        current = await self.message_controller.get_by_id(message_id)
+        if not current or current.deleted_at is not None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Message not found"
+            )
+        if current.sender_id != current_user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Not the author"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Message was edited concurrently (version {current.version})",
+        )
 
     async def delete_message_bulk(
         self, *, current_user_id: int, ids: list[int]
-    ) -> Dict[str, List[int]]:
+    ) -> Tuple[Dict[str, List[int]], Dict[int, List[int]]]:
         uniq_ids: List[int] = _normalize_ids(ids)
         if not uniq_ids:
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Empty ids"
             )
 
-        msgs: List[Message] = await self.message_controller.get_by_ids(uniq_ids)
-
-        found_ids = {m.id for m in msgs}
-        not_found = [i for i in uniq_ids if i not in found_ids]
-        forbidden = [m.id for m in msgs if m.sender_id != current_user_id]
+        deleted = await self.message_controller.soft_delete_many(
+            uniq_ids, sender_id=current_user_id, deleted_at=datetime.now(timezone.utc)
+        )
 
-        now = datetime.now(timezone.utc)
-        to_delete: List[Message] = [
-            m for m in msgs if m.sender_id == current_user_id and m.deleted_at is None
-        ]
+        by_conversation: Dict[int, List[int]] = {}
+        for message_id, conversation_id in deleted:
+            by_conversation.setdefault(conversation_id, []).append(message_id)
 
-        for m in to_delete:
-            m.deleted_at = now
+        # Only ids that were not deleted need classifying.
+        deleted_ids = {message_id for message_id, _ in deleted}
+        rest = [i for i in uniq_ids if i not in deleted_ids]
+        senders = await self.message_controller.get_senders(rest) if rest else {}
 
-        if to_delete:
+        if deleted:
+            await self.message_controller.record_deleted_messages(by_conversation)
             await self.db.commit()
 
-        return {
-            "deleted": [m.id for m in to_delete],
-            "forbidden": forbidden,
-            "not_found": not_found,
+        result = {
+            "deleted": sorted(deleted_ids),
+            "forbidden": [
+                i for i in rest if i in senders and senders[i] != current_user_id
+            ],
+            "not_found": [i for i in rest if i not in senders],
         }
+        return result, by_conversation
 
-    async def _ensure_membership(self, conversation_id: int, user_id: int) -> None:
-        res = await self.db.execute(
-            select(Conversation).where(Conversation.id == conversation_id)
+    async def mark_read(
+        self, *, conversation_id: int, user_id: int, message_id: int
+    ) -> Optional[int]:
+        # Returns the stored mark if it advanced. Ids past the newest message
+        # are clamped so a reader cannot pre-read messages not yet sent.
+        await self._ensure_membership(conversation_id, user_id)
+        last_id = await self.conversation_controller.get_last_message_id(
+            conversation_id
         )
-        conv = res.scalars().first()
-        if not conv or user_id not in (conv.user1_id, conv.user2_id):
+        if last_id is None:
+            return None
+        message_id = min(message_id, last_id)
+        if not read_receipts.mark(user_id, conversation_id, message_id):
+            return None
+        return message_id
+
+    async def _ensure_membership(self, conversation_id: int, user_id: int) -> None:
+        if not await self.conversation_controller.is_member(conversation_id, user_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="Not in conversation"
             )
@@ -103,13 +213,34 @@ class MessageService:
         limit: int = 50,
         before_id: Optional[int] = None,
         after_id: Optional[int] = None,
-    ) -> List[Message]:
+    ) -> List[dict]:
         await self._ensure_membership(conversation_id, user_id)
         limit = max(1, min(limit, 100))
-        return await self.message_controller.list_for_conversation(
-            conversation_id,
-            limit=limit,
-            before_id=before_id,
-            after_id=after_id,
-            include_deleted=False,
-        )
+
+        # The newest page and pages after a recent id come from the hot tail,
+        # which the broadcast stream keeps current.
+        if before_id is None:
+            if after_id:
+                cached = message_tail.get_after(conversation_id, after_id, limit)
+            else:
+                cached = message_tail.get_latest(conversation_id, limit)
+            if cached is not None:
+                return cached
+
+        seed = before_id is None and not after_id
+        if seed:
+            message_tail.begin_seed(conversation_id)
+        items = None
+        try:
+            rows = await self.message_controller.list_for_conversation(
+                conversation_id,
+                limit=limit,
+                before_id=before_id,
+                after_id=after_id,
+                include_deleted=False,
+            )
+            items = [message_out(m) for m in rows]
+        finally:
+            if seed:
+                message_tail.end_seed(conversation_id, items, limit)
+        return items
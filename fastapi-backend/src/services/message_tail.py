@@ -0,0 +1,243 @@
+import bisect
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from src.conf.config import settings
+from src.services.previews import PREVIEW_MIME
+from src.sockets.backplane import Backplane
+from src.sockets.events import encode
+
+# Published with the digest once an upload's previews are stored.
+PREVIEWS_TOPIC = "previews"
+
+
+def _awaits_previews(item: dict) -> bool:
+    return any(
+        a.get("mime_type") in PREVIEW_MIME and not a.get("lqip")
+        for a in item.get("attachments", ())
+    )
+
+
+class _Tail:
+    __slots__ = ("floor", "ids", "items", "sizes", "expires_at", "awaiting")
+
+    def __init__(self, floor: int, expires_at: float):
+        # Every live message with id > floor is held here.
+        self.floor = floor
+        self.ids: List[int] = []
+        self.items: Dict[int, dict] = {}
+        self.sizes: Dict[int, int] = {}
+        self.expires_at = expires_at
+        # Holds an image whose previews may still be generated.
+        self.awaiting = False
+
+
+class MessageTail:
+    def __init__(self, *, per_conversation: int, max_bytes: int, ttl: float):
+        self.per_conversation = max(1, per_conversation)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Off until attached to a backplane that carries writes from every
+        # worker; a process-local one would leave other workers' tails stale.
+        self.enabled = False
+        self._tails: "OrderedDict[int, _Tail]" = OrderedDict()
+        # conversation id -> [history reads in flight, written meanwhile]
+        self._seeding: Dict[int, list] = {}
+
+    def attach(self, backplane: Backplane) -> None:
+        backplane.subscribe(self.apply)
+        backplane.subscribe_gaps(self.reset)
+        self.enabled = backplane.cross_process
+
+    def reset(self, topic: Optional[str] = None) -> None:
+        # A missed event makes the affected tails unreliable; None means any
+        # conversation may have missed one.
+        if topic is None:
+            self._tails.clear()
+            self.bytes = 0
+            for state in self._seeding.values():
+                state[1] = True
+            return
+        kind, _, key = topic.partition(":")
+        if kind == PREVIEWS_TOPIC:
+            self._forget_previews()
+            return
+        if kind != "room":
+            return
+        conversation_id = int(key)
+        self._drop(conversation_id)
+        state = self._seeding.get(conversation_id)
+        if state is not None:
+            state[1] = True
+
+    def _get(self, conversation_id: int) -> Optional[_Tail]:
+        tail = self._tails.get(conversation_id)
+        if tail is not None and tail.expires_at < time.monotonic():
+            self._drop(conversation_id)
+            tail = None
+        if tail is not None:
+            self._tails.move_to_end(conversation_id)
+        return tail
+
+    def get_latest(self, conversation_id: int, limit: int) -> Optional[List[dict]]:
+        if not self.enabled:
+            return None
+        tail = self._get(conversation_id)
+        if tail is None or (len(tail.ids) < limit and tail.floor > 0):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [tail.items[i] for i in tail.ids[-limit:]]
+
+    def get_after(
+        self, conversation_id: int, after_id: int, limit: int
+    ) -> Optional[List[dict]]:
+        if not self.enabled:
+            return None
+        tail = self._get(conversation_id)
+        if tail is None or after_id < tail.floor:
+            self.misses += 1
+            return None
+        self.hits += 1
+        start = bisect.bisect_right(tail.ids, after_id)
+        return [tail.items[i] for i in tail.ids[start : start + limit]]
+
+    # A page read from the database only becomes the tail if nothing was
+    # written to the conversation while the read was in flight.
+    def begin_seed(self, conversation_id: int) -> None:
+        if not self.enabled:
+            return
+        state = self._seeding.setdefault(conversation_id, [0, False])
+        state[0] += 1
+
+    def end_seed(
+        self, conversation_id: int, items: Optional[List[dict]], limit: int
+    ) -> None:
+        state = self._seeding.get(conversation_id)
+        if state is None:
+            return
+        state[0] -= 1
+        dirty = state[1]
+        if state[0] <= 0:
+            del self._seeding[conversation_id]
+        if items is None or dirty or limit > self.per_conversation:
+            return
+
+        self._drop(conversation_id)
+        floor = items[0]["id"] - 1 if items and len(items) >= limit else 0
+        tail = _Tail(floor, time.monotonic() + self.ttl)
+        self._tails[conversation_id] = tail
+        for item in items:
+            self._insert(tail, item)
+        self._evict()
+
+    def _forget_previews(self) -> None:
+        # The stored previews are not in the cached entries; drop the tails
+        # that might show those attachments and any page read before them.
+        for conversation_id in [c for c, t in self._tails.items() if t.awaiting]:
+            self._drop(conversation_id)
+        for state in self._seeding.values():
+            state[1] = True
+
+    async def apply(self, topic: str, payload: str) -> None:
+        kind, _, key = topic.partition(":")
+        if kind == PREVIEWS_TOPIC:
+            self._forget_previews()
+            return
+        if kind != "room":
+            return
+        conversation_id = int(key)
+        tail = self._tails.get(conversation_id)
+        state = self._seeding.get(conversation_id)
+        if tail is None and state is None:
+            return
+
+        event = json.loads(payload)
+        event_type = event.get("type", "")
+        if not event_type.startswith("message:"):
+            return
+        if state is not None:
+            state[1] = True
+        if tail is None:
+            return
+
+        if event_type == "message:new":
+            self._insert(tail, event["message"])
+            self._trim(tail)
+            self._evict()
+        elif event_type == "message:edited":
+            msg = event["message"]
+            current = tail.items.get(msg["id"])
+            if current is not None:
+                self._replace(tail, {**current, **msg})
+        elif event_type == "message:deleted":
+            for message_id in event.get("message_ids", []):
+                self._remove(tail, message_id)
+
+    def _insert(self, tail: _Tail, item: dict) -> None:
+        message_id = item["id"]
+        if message_id <= tail.floor:
+            return
+        if message_id in tail.items:
+            self._replace(tail, item)
+            return
+        bisect.insort(tail.ids, message_id)
+        tail.items[message_id] = item
+        tail.awaiting = tail.awaiting or _awaits_previews(item)
+        tail.sizes[message_id] = len(encode(item))
+        self.bytes += tail.sizes[message_id]
+
+    def _replace(self, tail: _Tail, item: dict) -> None:
+        message_id = item["id"]
+        size = len(encode(item))
+        self.bytes += size - tail.sizes[message_id]
+        tail.items[message_id] = item
+        tail.sizes[message_id] = size
+
+    def _remove(self, tail: _Tail, message_id: int) -> None:
+        if message_id not in tail.items:
+            return
+        tail.ids.remove(message_id)
+        del tail.items[message_id]
+        self.bytes -= tail.sizes.pop(message_id)
+
+    def _trim(self, tail: _Tail) -> None:
+        while len(tail.ids) > self.per_conversation:
+            oldest = tail.ids[0]
+            self._remove(tail, oldest)
+            tail.floor = oldest
+
+    def _drop(self, conversation_id: int) -> None:
+        tail = self._tails.pop(conversation_id, None)
+        if tail is not None:
+            self.bytes -= sum(tail.sizes.values())
+
+    def _evict(self) -> None:
+        while self.bytes > self.max_bytes and self._tails:
+            conversation_id = next(iter(self._tails))
+            self._drop(conversation_id)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "conversations": len(self._tails),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+message_tail = MessageTail(
+    per_conversation=settings.HOT_TAIL_SIZE,
+    max_bytes=settings.HOT_TAIL_MAX_MB * 1024 * 1024,
+    ttl=settings.HOT_TAIL_TTL_SECONDS,
+)
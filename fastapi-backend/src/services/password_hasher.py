@@ -0,0 +1,92 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from src.conf.config import settings
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    def __init__(self, *, max_workers: int, max_pending: int):
+        # bcrypt releases the GIL, so a small dedicated pool keeps hashing off
+        # the event loop without competing with the default threadpool.
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="bcrypt"
+        )
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    async def hash(self, password: str) -> str:
+        def _hash() -> str:
+            hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+            return hashed.decode("utf-8")
+
+        return await self._run(_hash)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        def _verify() -> bool:
+            return bcrypt.checkpw(
+                password.encode("utf-8"), hashed_password.encode("utf-8")
+            )
+
+        return await self._run(_verify)
+
+    async def _run(self, fn: Callable[[], T]) -> T:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, retry later",
+            )
+
+        queued_at = time.perf_counter()
+
+        def _job():
+            return time.perf_counter() - queued_at, fn()
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            waited, result = await loop.run_in_executor(self._executor, _job)
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return result
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "queued": max(0, self.pending - self.max_workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": (
+                self.wait_seconds_total / self.completed * 1000
+                if self.completed
+                else 0.0
+            ),
+            "max_wait_ms": self.wait_seconds_max * 1000,
+        }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,175 @@
+import asyncio
+import base64
+import io
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+from typing import Awaitable, Callable, List, Optional, Set
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+from src.conf.config import settings
+from src.controllers.stored_object_controller import StoredObjectController
+from src.database.db import session_manager
+from src.storage.backends import storage
+from src.storage.base import StorageBackend
+
+logger = logging.getLogger("uvicorn.error")
+
+PREVIEW_MIME = {"image/png", "image/jpeg", "image/webp", "image/gif"}
+LQIP_SIZE = 16
+
+
+def render_previews(src: str, sizes: List[int]) -> dict:
+    # Runs in a worker process: decode once, then downscale per size.
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)
+        im = im.convert("RGBA" if "A" in im.getbands() else "RGB")
+
+        thumbnails = []
+        for size in sorted(sizes):
+            if max(im.size) <= size:
+                break
+            thumb = im.copy()
+            thumb.thumbnail((size, size))
+            fd, out = tempfile.mkstemp(suffix=".webp", dir=os.path.dirname(src))
+            with os.fdopen(fd, "wb") as f:
+                thumb.save(f, "WEBP", quality=80)
+            thumbnails.append(
+                {
+                    "size": size,
+                    "path": out,
+                    "width": thumb.width,
+                    "height": thumb.height,
+                }
+            )
+
+        tiny = im.copy()
+        tiny.thumbnail((LQIP_SIZE, LQIP_SIZE))
+        buf = io.BytesIO()
+        tiny.save(buf, "WEBP", quality=40)
+        lqip = "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode()
+
+    return {"thumbnails": thumbnails, "lqip": lqip}
+
+
+class PreviewPipeline:
+    def __init__(
+        self,
+        backend: StorageBackend,
+        *,
+        workers: int,
+        sizes: List[int],
+        max_pending: int,
+    ):
+        self.backend = backend
+        self.workers = workers
+        self.sizes = sizes
+        self.max_pending = max(1, max_pending)
+        # Told the digest once its previews are stored.
+        self.on_ready: Optional[Callable[[str], Awaitable[None]]] = None
+        self.done = 0
+        self.failed = 0
+        self.dropped = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return Image is not None and self.workers > 0
+
+    def wants(self, mime: Optional[str]) -> bool:
+        return self.enabled and (mime or "") in PREVIEW_MIME
+
+    def submit(self, *, sha256: str, folder: str, src: str) -> None:
+        # Takes ownership of src; previews are best-effort and never block
+        # or fail the upload that produced them.
+        if len(self._tasks) >= self.max_pending:
+            self.dropped += 1
+            with suppress(FileNotFoundError):
+                os.unlink(src)
+            return
+        task = asyncio.create_task(self._process(sha256, folder, src))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, sha256: str, folder: str, src: str) -> None:
+        if self._pool is None:
+            # Forking a process that runs an event loop and holds pooled
+            # connections copies both; start workers from a clean server.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        outputs: List[str] = []
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self._pool, render_previews, src, self.sizes
+            )
+            outputs = [t["path"] for t in result["thumbnails"]]
+
+            thumbnails = []
+            for t in result["thumbnails"]:
+                meta = await self.backend.save(
+                    t["path"],
+                    size=os.path.getsize(t["path"]),
+                    file_name=f"thumb_{t['size']}.webp",
+                    mime="image/webp",
+                    folder=f"{folder}/thumbs",
+                )
+                thumbnails.append(
+                    {
+                        "size": t["size"],
+                        "url": meta["file_path"],
+                        "width": t["width"],
+                        "height": t["height"],
+                    }
+                )
+
+            async with session_manager.session() as db:
+                await StoredObjectController(db).set_previews(
+                    sha256,
+                    self.backend.name,
+                    {"thumbnails": thumbnails, "lqip": result["lqip"]},
+                )
+            self.done += 1
+            if self.on_ready:
+                await self.on_ready(sha256)
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"Preview generation failed for {sha256}: {e}")
+        finally:
+            for path in [src, *outputs]:
+                with suppress(FileNotFoundError):
+                    os.unlink(path)
+
+    async def stop(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending": len(self._tasks),
+            "done": self.done,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+
+preview_pipeline = PreviewPipeline(
+    storage,
+    workers=settings.PREVIEW_WORKERS,
+    sizes=[int(s) for s in settings.PREVIEW_SIZES.split(",") if s.strip()],
+    max_pending=settings.PREVIEW_MAX_PENDING,
+)
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+from src.conf.config import settings
+from src.controllers.conversation_read_controller import ConversationReadController
+from src.core.cache import TTLCache
+from src.database.db import session_manager
+
+logger = logging.getLogger("uvicorn.error")
+
+# Keeps each statement well under asyncpg's bind-parameter limit.
+FLUSH_CHUNK_ROWS = 5000
+
+
+class ReadReceiptBuffer:
+    def __init__(self, *, flush_interval_ms: float, max_pending: int):
+        self.flush_interval = max(1.0, flush_interval_ms) / 1000
+        self.max_pending = max(1, max_pending)
+        self.marks = 0
+        self.coalesced = 0
+        self.flushed_rows = 0
+        self.flushes = 0
+        # (user_id, conversation_id) -> highest message id read, not yet saved.
+        self._pending: Dict[Tuple[int, int], int] = {}
+        # Last high-water mark seen by this process, to drop stale marks early.
+        self._seen = TTLCache(maxsize=100_000, ttl=3600)
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def start(self) -> None:
+        if self._worker is None:
+            self._stopping = False
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        # Wake the worker so it performs a final flush and exits.
+        self._stopping = True
+        self._wakeup.set()
+        await self._worker
+        self._worker = None
+
+    def mark(self, user_id: int, conversation_id: int, message_id: int) -> bool:
+        key = (user_id, conversation_id)
+        if message_id <= self._seen.get(key, 0):
+            self.coalesced += 1
+            return False
+        self._seen.set(key, message_id)
+        self.marks += 1
+        if key in self._pending:
+            self.coalesced += 1
+        self._pending[key] = message_id
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+        return True
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        rows = [
+            {
+                "conversation_id": conversation_id,
+                "user_id": user_id,
+                "last_read_message_id": message_id,
+            }
+            for (user_id, conversation_id), message_id in sorted(
+                pending.items(), key=lambda item: (item[0][1], item[0][0])
+            )
+        ]
+        try:
+            async with session_manager.session() as db:
+                controller = ConversationReadController(db)
+                for i in range(0, len(rows), FLUSH_CHUNK_ROWS):
+                    await controller.upsert_many(rows[i : i + FLUSH_CHUNK_ROWS])
+        except Exception as e:
+            logger.error(f"Read receipt flush failed: {e}")
+            # Put marks back unless newer ones arrived meanwhile.
+            for key, message_id in pending.items():
+                if self._pending.get(key, 0) < message_id:
+                    self._pending[key] = message_id
+            return
+        self.flushes += 1
+        self.flushed_rows += len(rows)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "marks": self.marks,
+            "coalesced": self.coalesced,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+        }
+
+
+read_receipts = ReadReceiptBuffer(
+    flush_interval_ms=settings.READ_RECEIPT_FLUSH_MS,
+    max_pending=settings.READ_RECEIPT_MAX_PENDING,
+)
@@ -22,11 +22,11 @@ class RefreshTokenService:
     def _hash_token(self, token: str) -> str:
         return hashlib.sha256(token.encode("utf-8")).hexdigest()
 
-    async def create_access_token(self, username: str) -> str:
+    async def create_access_token(self, username: str, user_id: int) -> str:
         expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         expire = datetime.now(timezone.utc) + expires_delta
 
-        to_encode = {"exp": expire, "sub": username}
+        to_encode = {"exp": expire, "sub": username, "uid": user_id}
         encode_jwt = jwt.encode(
             to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
         )
@@ -71,7 +71,7 @@ class RefreshTokenService:
         if refresh_obj:
             await self.refresh_token_controller.revoke_token(refresh_obj)
 
-        access_token = await self.create_access_token(user.username)
+        access_token = await self.create_access_token(user.username, user.id)
         refresh_raw, refresh_expires = await self.create_refresh_token(user.id)
 
         return access_token, refresh_raw, refresh_expires
@@ -0,0 +1,186 @@
+import os
+import re
+import shutil
+from contextlib import suppress
+from typing import Dict, Optional
+
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+
+from src.conf.config import settings
+from src.controllers.stored_object_controller import StoredObjectController
+from src.database.db import session_manager
+from src.models.chat_model import StoredObject
+from src.services.previews import preview_pipeline
+from src.storage.backends import storage
+from src.storage.base import StorageBackend
+from src.storage.spool import max_upload_bytes, spool_upload, upload_slots
+
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _allowed_mime_set() -> set[str]:
+    raw = settings.ALLOWED_MIME or ""
+    return {s.strip().lower() for s in raw.split(",") if s.strip()}
+
+
+def _meta(obj: StoredObject, file_name: Optional[str]) -> Dict:
+    return {
+        "file_path": obj.file_path,
+        "file_name": file_name or "file",
+        "mime": obj.mime_type,
+        "size_bytes": obj.size_bytes,
+        "storage": obj.storage,
+        "provider_id": obj.provider_id,
+        "sha256": obj.sha256,
+        "thumbnails": (obj.previews or {}).get("thumbnails", []),
+        "lqip": (obj.previews or {}).get("lqip"),
+    }
+
+
+def _link_or_copy(path: str) -> str:
+    # The backend may move or delete the spool file, so previews get their
+    # own name for the same bytes.
+    target = path + ".preview"
+    try:
+        os.link(path, target)
+    except OSError:
+        shutil.copyfile(path, target)
+    return target
+
+
+def _check_mime(mime: Optional[str]) -> str:
+    allowed = _allowed_mime_set()
+    mime = (mime or "application/octet-stream").strip().lower()
+    if allowed and mime not in allowed:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported media type: {mime}",
+        )
+    return mime
+
+
+def _user_folder(user_id: int) -> str:
+    return f"users/{user_id}"
+
+
+class UploadService:
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.presigned = 0
+        self.completed = 0
+
+    async def find(
+        self, sha256: str, file_name: Optional[str] = None
+    ) -> Optional[Dict]:
+        sha256 = (sha256 or "").strip().lower()
+        if not _SHA256.match(sha256):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Invalid sha256",
+            )
+        async with session_manager.session() as db:
+            obj = await StoredObjectController(db).get_by_digest(
+                sha256, self.backend.name
+            )
+        return _meta(obj, file_name) if obj else None
+
+    async def upload(self, file: UploadFile, *, folder: str) -> Dict:
+        mime = _check_mime(file.content_type)
+        file_name = file.filename or "file"
+
+        async with upload_slots:
+            async with spool_upload(file) as (path, size, sha256):
+                existing = await self.find(sha256, file_name)
+                if existing is not None:
+                    self.hits += 1
+                    return existing
+
+                self.misses += 1
+                preview_src = None
+                if preview_pipeline.wants(mime):
+                    preview_src = await run_in_threadpool(_link_or_copy, path)
+                try:
+                    meta = await self.backend.save(
+                        path, size=size, file_name=file_name, mime=mime, folder=folder
+                    )
+                except Exception:
+                    if preview_src:
+                        with suppress(FileNotFoundError):
+                            os.unlink(preview_src)
+                    raise
+
+        async with session_manager.session() as db:
+            await StoredObjectController(db).record(
+                {
+                    "sha256": sha256,
+                    "storage": meta["storage"],
+                    "size_bytes": meta["size_bytes"] or size,
+                    "mime_type": mime,
+                    "file_path": meta["file_path"],
+                    "provider_id": meta.get("provider_id"),
+                }
+            )
+        if preview_src:
+            preview_pipeline.submit(sha256=sha256, folder=folder, src=preview_src)
+        meta.update({"sha256": sha256, "thumbnails": [], "lqip": None})
+        return meta
+
+    async def presign(
+        self, *, user_id: int, file_name: str, mime: str, size_bytes: int
+    ) -> Dict:
+        mime = _check_mime(mime)
+        if size_bytes > max_upload_bytes():
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File too large (> {settings.MAX_UPLOAD_MB}MB)",
+            )
+        self.presigned += 1
+        return await self.backend.presign(
+            folder=_user_folder(user_id),
+            file_name=file_name,
+            mime=mime,
+            max_bytes=max_upload_bytes(),
+        )
+
+    async def complete(
+        self, *, user_id: int, provider_id: str, file_name: str, mime: str
+    ) -> Dict:
+        # Only objects under the caller's own folder can be claimed.
+        if not provider_id.startswith(_user_folder(user_id) + "/"):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Not your upload"
+            )
+        meta = await self.backend.verify(provider_id)
+        mime = _check_mime(meta.get("mime") or mime)
+        if (meta.get("size_bytes") or 0) > max_upload_bytes():
+            await self.backend.discard(provider_id)
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File too large (> {settings.MAX_UPLOAD_MB}MB)",
+            )
+        self.completed += 1
+        meta.update(
+            {
+                "file_name": file_name,
+                "mime": mime,
+                "sha256": None,
+                "thumbnails": [],
+                "lqip": None,
+            }
+        )
+        return meta
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "presigned": self.presigned,
+            "completed": self.completed,
+        }
+
+
+upload_service = UploadService(storage)
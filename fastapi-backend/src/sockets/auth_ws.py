@@ -32,14 +32,18 @@ async def authenticate_ws(ws: WebSocket, db: AsyncSession):
         await ws.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid token")
         return None
 
+    user_id = payload.get("uid")
     username = payload.get("sub")
-    if not username:
+    if isinstance(user_id, int):
+        user = await UserController(db).get_cached_user_by_id(user_id)
+    elif username:
+        user = await UserController(db).get_cached_user_by_username(username)
+    else:
         await ws.close(
             code=status.WS_1008_POLICY_VIOLATION, reason="Invalid token payload"
         )
         return None
 
-    user = await UserController(db).get_user_by_username(username)
     if not user:
         await ws.close(code=status.WS_1008_POLICY_VIOLATION, reason="User not found")
         return None
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from src.conf.config import settings
+from src.database.db import session_manager
+
+logger = logging.getLogger("uvicorn.error")
+
+Handler = Callable[[str, str], Awaitable[None]]
+# Called with a topic when one of its events was lost, or None when any
+# event may have been (e.g. while the listener was reconnecting).
+GapHandler = Callable[[Optional[str]], None]
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more.
+PG_NOTIFY_MAX_BYTES = 7999
+# Larger events are stored in backplane_events and NOTIFY carries "#<id>".
+REF_PREFIX = "#"
+# Stored events only need to outlive delivery to the listening workers.
+EVENT_RETENTION = "5 minutes"
+
+
+class Backplane:
+    # Whether events published here reach every process, not just this one.
+    cross_process = False
+
+    def __init__(self):
+        self._handlers: List[Handler] = []
+        self._gap_handlers: List[GapHandler] = []
+
+    def subscribe(self, handler: Handler) -> None:
+        self._handlers.append(handler)
+
+    def subscribe_gaps(self, handler: GapHandler) -> None:
+        self._gap_handlers.append(handler)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, topic: str, payload: str) -> None:
+        raise NotImplementedError
+
+    async def _dispatch(self, topic: str, payload: str) -> None:
+        for handler in list(self._handlers):
+            try:
+                await handler(topic, payload)
+            except Exception as e:
+                logger.error(f"Backplane handler failed: {e}", exc_info=True)
+
+    def report_gap(self, topic: Optional[str]) -> None:
+        for handler in list(self._gap_handlers):
+            try:
+                handler(topic)
+            except Exception as e:
+                logger.error(f"Backplane gap handler failed: {e}", exc_info=True)
+
+
+# Single-process transport; several managers sharing one instance behave
+# like separate workers attached to the same channel.
+class InMemoryBackplane(Backplane):
+    async def publish(self, topic: str, payload: str) -> None:
+        await self._dispatch(topic, payload)
+
+
+class PostgresBackplane(Backplane):
+    cross_process = True
+
+    def __init__(self, dsn: str, channel: str):
+        super().__init__()
+        self._dsn = dsn
+        self._channel = channel
+        self._conn: Optional[asyncpg.Connection] = None
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._consumer: Optional[asyncio.Task] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    async def start(self) -> None:
+        self._closing = False
+        self._consumer = asyncio.create_task(self._consume())
+        await self._listen()
+
+    async def stop(self) -> None:
+        self._closing = True
+        for task in (self._reconnect_task, self._consumer):
+            if task:
+                task.cancel()
+        if self._conn and not self._conn.is_closed():
+            await self._conn.remove_listener(self._channel, self._on_notify)
+            await self._conn.close()
+        self._conn = None
+
+    async def publish(self, topic: str, payload: str) -> None:
+        # Payloads are already encoded frames; prefix the topic on its own
+        # line instead of wrapping them in another JSON envelope.
+        message = f"{topic}\n{payload}"
+        async with session_manager.engine.connect() as conn:
+            if len(message.encode("utf-8")) > PG_NOTIFY_MAX_BYTES:
+                # NOTIFY is delivered on commit, so the row is visible to
+                # every listener by the time it hears about it.
+                await conn.execute(
+                    text(
+                        "DELETE FROM backplane_events "
+                        f"WHERE created_at < now() - interval '{EVENT_RETENTION}'"
+                    )
+                )
+                event_id = await conn.scalar(
+                    text(
+                        "INSERT INTO backplane_events (topic, payload) "
+                        "VALUES (:topic, :payload) RETURNING id"
+                    ),
+                    {"topic": topic, "payload": payload},
+                )
+                message = f"{REF_PREFIX}{event_id}"
+            await conn.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": self._channel, "payload": message},
+            )
+            await conn.commit()
+
+    async def _fetch(self, event_id: int) -> Optional[Tuple[str, str]]:
+        async with session_manager.engine.connect() as conn:
+            res = await conn.execute(
+                text("SELECT topic, payload FROM backplane_events WHERE id = :id"),
+                {"id": event_id},
+            )
+            row = res.first()
+        return (row.topic, row.payload) if row else None
+
+    async def _listen(self) -> None:
+        self._conn = await asyncpg.connect(self._dsn)
+        self._conn.add_termination_listener(self._on_terminate)
+        await self._conn.add_listener(self._channel, self._on_notify)
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        if payload.startswith(REF_PREFIX):
+            self._inbox.put_nowait((None, payload[len(REF_PREFIX) :]))
+            return
+        topic, sep, message = payload.partition("\n")
+        if not sep:
+            logger.warning(f"Dropping malformed backplane payload: {payload!r}")
+            return
+        self._inbox.put_nowait((topic, message))
+
+    def _on_terminate(self, connection) -> None:
+        if self._closing:
+            return
+        logger.warning("Backplane listener connection lost, reconnecting")
+        self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = 0.5
+        while not self._closing:
+            try:
+                await self._listen()
+                # Anything published while we were away is gone for good.
+                self.report_gap(None)
+                return
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.error(f"Backplane reconnect failed: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 10)
+
+    async def _consume(self) -> None:
+        while True:
+            topic, payload = await self._inbox.get()
+            if topic is None:
+                try:
+                    event = await self._fetch(int(payload))
+                except Exception as e:
+                    logger.error(f"Backplane event {payload} fetch failed: {e}")
+                    event = None
+                if event is None:
+                    self.report_gap(None)
+                    continue
+                topic, payload = event
+            await self._dispatch(topic, payload)
+
+
+def _asyncpg_dsn(url: str) -> str:
+    return (
+        make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+    )
+
+
+def create_backplane() -> Backplane:
+    kind = (settings.WS_BACKPLANE or "memory").strip().lower()
+    if kind == "postgres":
+        return PostgresBackplane(
+            _asyncpg_dsn(settings.DB_URL), settings.WS_BACKPLANE_CHANNEL
+        )
+    if kind == "memory":
+        return InMemoryBackplane()
+    raise RuntimeError(f"Unknown WS_BACKPLANE: {settings.WS_BACKPLANE}")
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional, Set
+
+from fastapi import WebSocket, status
+
+from src.sockets.events import encode
+
+logger = logging.getLogger("uvicorn.error")
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DISCONNECT = "disconnect"
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_DISCONNECT)
+
+
+class Connection:
+    def __init__(
+        self,
+        ws: WebSocket,
+        *,
+        max_queue: int,
+        overflow_policy: str,
+        on_close: Callable[["Connection"], Awaitable[None]],
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise RuntimeError(f"Unknown WS overflow policy: {overflow_policy}")
+        self.ws = ws
+        self.user_id: Optional[int] = None
+        self.follow_user = False
+        self.rooms: Set[int] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_queue))
+        self.overflow_policy = overflow_policy
+        self.dropped = 0
+        self.max_depth = 0
+        self.closed = False
+        self.evicted = False
+        self._on_close = on_close
+        self._writer: Optional[asyncio.Task] = None
+        self._closer: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def send(self, data: dict) -> bool:
+        return self.send_frame(encode(data))
+
+    def send_frame(self, frame: str) -> bool:
+        if self.closed or self._closer:
+            return False
+        if self.queue.full():
+            if self.overflow_policy == OVERFLOW_DISCONNECT:
+                logger.warning("Disconnecting slow WebSocket consumer")
+                self.evicted = True
+                self._closer = asyncio.create_task(
+                    self.close(status.WS_1013_TRY_AGAIN_LATER)
+                )
+                return False
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(frame)
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+        return True
+
+    async def close(self, code: int = status.WS_1000_NORMAL_CLOSURE) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        if self._writer and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        try:
+            await self.ws.close(code=code)
+        except Exception:
+            pass
+        await self._on_close(self)
+
+    async def _write_loop(self) -> None:
+        while True:
+            frame = await self.queue.get()
+            try:
+                await self.ws.send_text(frame)
+            except Exception:
+                await self.close()
+                return
@@ -0,0 +1,87 @@
+import json
+from typing import Iterable, List, Optional
+
+from sqlalchemy import inspect
+
+from src.models.chat_model import Attachment, Message
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def encode(data: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(data).decode("utf-8")
+    return json.dumps(data, separators=(",", ":"), default=str)
+
+
+def attachment_payload(att: Attachment) -> dict:
+    # stored_object is lazy="raise"; callers that want previews load it.
+    previews = {}
+    if "stored_object" not in inspect(att).unloaded and att.stored_object:
+        previews = att.stored_object.previews or {}
+    return {
+        "id": att.id,
+        "file_name": att.file_name,
+        "mime_type": att.mime_type,
+        "size_bytes": att.size_bytes,
+        "storage": att.storage,
+        "file_path": att.file_path,
+        "thumbnails": previews.get("thumbnails", []),
+        "lqip": previews.get("lqip"),
+    }
+
+
+def message_payload(msg: Message) -> dict:
+    return {
+        "id": msg.id,
+        "conversation_id": msg.conversation_id,
+        "sender_id": msg.sender_id,
+        "content": msg.content,
+        "is_edited": msg.is_edited,
+        "version": msg.version,
+        "deleted": msg.deleted_at is not None,
+        "created_at": msg.created_at.isoformat() if msg.created_at else None,
+    }
+
+
+def message_with_attachments(
+    msg: Message, attachments: Optional[Iterable[Attachment]] = None
+) -> dict:
+    # The one shape for a message with attachments, whether it is read from
+    # the database, broadcast, or served from the hot tail.
+    payload = message_payload(msg)
+    payload["attachments"] = [attachment_payload(a) for a in (attachments or [])]
+    return payload
+
+
+def message_new(
+    msg: Message, attachments: Optional[Iterable[Attachment]] = None
+) -> dict:
+    return {
+        "type": "message:new",
+        "message": message_with_attachments(msg, attachments),
+    }
+
+
+def message_edited(msg: Message) -> dict:
+    return {"type": "message:edited", "message": message_payload(msg)}
+
+
+def messages_deleted(conversation_id: int, message_ids: List[int]) -> dict:
+    return {
+        "type": "message:deleted",
+        "conversation_id": conversation_id,
+        "message_ids": list(message_ids),
+    }
+
+
+def read_receipt(conversation_id: int, user_id: int, message_id: int) -> dict:
+    return {
+        "type": "read:receipt",
+        "conversation_id": conversation_id,
+        "user_id": user_id,
+        "message_id": message_id,
+    }
@@ -1,3 +1,31 @@
+from src.conf.config import settings
+from src.services.message_ingest import MessageIngest
+from src.services.message_tail import PREVIEWS_TOPIC, message_tail
+from src.services.previews import preview_pipeline
+from src.sockets import events
+from src.sockets.backplane import create_backplane
 from src.sockets.manager import ConnectionManager
 
-manager = ConnectionManager()
+manager = ConnectionManager(create_backplane())
+# Every room event passes through the backplane, so the hot tail sees writes
+# from all workers, not only this one.
+message_tail.attach(manager.backplane)
+
+
+async def _previews_ready(sha256: str):
+    await manager.publish(f"{PREVIEWS_TOPIC}:{sha256}", "")
+
+
+preview_pipeline.on_ready = _previews_ready
+
+
+async def _broadcast_new(msg, attachments):
+    await manager.broadcast(msg.conversation_id, events.message_new(msg, attachments))
+
+
+ingest = MessageIngest(
+    max_batch=settings.MESSAGE_INGEST_BATCH_SIZE,
+    max_delay_ms=settings.MESSAGE_INGEST_BATCH_MS,
+    max_pending=settings.MESSAGE_INGEST_MAX_PENDING,
+    on_persisted=_broadcast_new,
+)
@@ -1,27 +1,129 @@
-from typing import Dict, Set
+import logging
+from typing import Dict, Iterable, Optional, Set
 from fastapi import WebSocket
 
+from src.conf.config import settings
+from src.sockets.backplane import Backplane, InMemoryBackplane
+from src.sockets.connection import Connection
+from src.sockets.events import encode
+
+logger = logging.getLogger("uvicorn.error")
+
+ROOM_TOPIC = "room"
+JOIN_TOPIC = "join"
+
 
 class ConnectionManager:
-    def __init__(self):
-        self.rooms: Dict[int, Set[WebSocket]] = {}
+    def __init__(self, backplane: Optional[Backplane] = None):
+        self.rooms: Dict[int, Set[Connection]] = {}
+        self.users: Dict[int, Set[Connection]] = {}
+        self.backplane = backplane or InMemoryBackplane()
+        self.backplane.subscribe(self._deliver)
+        self.slow_disconnects = 0
+        self.dropped_frames = 0
+
+    async def start(self):
+        await self.backplane.start()
 
-    async def connect(self, room_id: int, ws: WebSocket):
+    async def stop(self):
+        await self.backplane.stop()
+
+    async def connect(
+        self,
+        ws: WebSocket,
+        *,
+        user_id: int,
+        room_ids: Iterable[int] = (),
+        follow_user: bool = False,
+    ) -> Connection:
         await ws.accept()
-        self.rooms.setdefault(room_id, set()).add(ws)
+        conn = Connection(
+            ws,
+            max_queue=settings.WS_SEND_QUEUE_SIZE,
+            overflow_policy=settings.WS_OVERFLOW_POLICY,
+            on_close=self._forget,
+        )
+        conn.user_id = user_id
+        conn.follow_user = follow_user
+        conn.start()
+        self.users.setdefault(user_id, set()).add(conn)
+        for room_id in room_ids:
+            self.subscribe(conn, room_id)
+        return conn
+
+    async def disconnect(self, conn: Connection):
+        await conn.close()
+
+    def subscribe(self, conn: Connection, room_id: int):
+        if conn.closed:
+            return
+        self.rooms.setdefault(room_id, set()).add(conn)
+        conn.rooms.add(room_id)
 
-    async def disconnect(self, room_id: int, ws: WebSocket):
+    def unsubscribe(self, conn: Connection, room_id: int):
+        conn.rooms.discard(room_id)
         peers = self.rooms.get(room_id)
         if not peers:
             return
-
-        peers.discard(ws)
+        peers.discard(conn)
         if not peers:
             self.rooms.pop(room_id, None)
 
-    async def broadcast(self, room_id: int, data: dict):
-        for ws in list(self.rooms.get(room_id, ())):
-            try:
-                await ws.send_json(data)
-            except Exception:
-                await self.disconnect(room_id, ws)
+    async def publish(self, topic: str, payload: str) -> bool:
+        try:
+            await self.backplane.publish(topic, payload)
+            return True
+        except Exception as e:
+            # Callers publish after their change has committed, so a lost
+            # event must not fail the request; listeners that cache from the
+            # stream are told to stop trusting it instead.
+            logger.error(f"Backplane publish to {topic} failed: {e}", exc_info=True)
+            self.backplane.report_gap(topic)
+            return False
+
+    async def broadcast(self, room_id: int, data: dict) -> bool:
+        return await self.publish(f"{ROOM_TOPIC}:{room_id}", encode(data))
+
+    async def subscribe_user(self, user_id: int, room_id: int) -> bool:
+        # Adds the room to every user-level socket of this user, on every worker.
+        return await self.publish(f"{JOIN_TOPIC}:{user_id}", str(room_id))
+
+    async def _deliver(self, topic: str, payload: str):
+        kind, _, key = topic.partition(":")
+        if kind not in (ROOM_TOPIC, JOIN_TOPIC):
+            return
+        target = int(key)
+        if kind == ROOM_TOPIC:
+            for conn in list(self.rooms.get(target, ())):
+                conn.send_frame(payload)
+        elif kind == JOIN_TOPIC:
+            room_id = int(payload)
+            for conn in list(self.users.get(target, ())):
+                if conn.follow_user:
+                    self.subscribe(conn, room_id)
+
+    async def _forget(self, conn: Connection):
+        self.dropped_frames += conn.dropped
+        if conn.evicted:
+            self.slow_disconnects += 1
+        for room_id in list(conn.rooms):
+            self.unsubscribe(conn, room_id)
+        owners = self.users.get(conn.user_id)
+        if owners:
+            owners.discard(conn)
+            if not owners:
+                self.users.pop(conn.user_id, None)
+
+    def stats(self) -> dict:
+        conns = {c for peers in self.users.values() for c in peers}
+        depths = [c.queue.qsize() for c in conns]
+        return {
+            "rooms": len(self.rooms),
+            "users": len(self.users),
+            "connections": len(conns),
+            "queued_frames": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "peak_queue_depth": max((c.max_depth for c in conns), default=0),
+            "dropped_frames": self.dropped_frames + sum(c.dropped for c in conns),
+            "slow_disconnects": self.slow_disconnects,
+        }
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, status
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from datetime import datetime, timezone
 
-from src.database.db import get_db
-from src.sockets.hub import manager
+from src.conf.config import settings
+from src.controllers.conversation_controller import ConversationController
+from src.database.db import session_manager
+from src.services.message_service import MessageService, build_message
+from src.sockets.connection import Connection
+from src.sockets.hub import manager, ingest
 from src.sockets.auth_ws import authenticate_ws
-from src.models.chat_model import Conversation, Message, Attachment
+from src.sockets import events
+from src.models.user_model import User
 
 ws_router = APIRouter()
 
@@ -14,30 +17,87 @@ ws_router = APIRouter()
 async def _user_in_conversation(
     db: AsyncSession, conversation_id: int, user_id: int
 ) -> bool:
-    res = await db.execute(
-        select(Conversation).where(Conversation.id == conversation_id)
-    )
-    conv = res.scalars().first()
-    return bool(conv and user_id in (conv.user1_id, conv.user2_id))
+    return await ConversationController(db).is_member(conversation_id, user_id)
 
 
-@ws_router.websocket("/ws/conversation/{conversation_id}")
-async def chat_ws(
-    ws: WebSocket, conversation_id: int, db: AsyncSession = Depends(get_db)
-):
-    user = await authenticate_ws(ws, db)
-    if not user:
+async def _handle_send_message(
+    conn: Connection,
+    user: User,
+    conversation_id: int,
+    incoming: dict,
+) -> None:
+    try:
+        if settings.MESSAGE_INGEST_BATCHING:
+            values, attachments = build_message(
+                conversation_id=conversation_id,
+                sender_id=user.id,
+                content=incoming.get("content"),
+                attachments=incoming.get("attachments"),
+                reply_to_id=incoming.get("reply_to_id"),
+            )
+            # The ingest worker broadcasts once the batch is committed.
+            await ingest.submit(values, attachments)
+            return
+
+        async with session_manager.session() as db:
+            msg, atts = await MessageService(db).send_message(
+                conversation_id=conversation_id,
+                sender_id=user.id,
+                content=incoming.get("content"),
+                attachments=incoming.get("attachments"),
+                reply_to_id=incoming.get("reply_to_id"),
+            )
+    except HTTPException as e:
+        conn.send({"type": "error", "message": e.detail})
         return
 
-    if not await _user_in_conversation(db, conversation_id, user.id):
+    await manager.broadcast(conversation_id, events.message_new(msg, atts))
+
+
+async def _handle_read_up_to(
+    conn: Connection, user: User, conversation_id: int, incoming: dict
+) -> None:
+    message_id = incoming.get("message_id")
+    if not isinstance(message_id, int) or message_id <= 0:
+        conn.send({"type": "error", "message": "Invalid message_id"})
+        return
+    # Marks are buffered and upserted in batches; only an advancing mark
+    # is worth telling the other side about.
+    try:
+        async with session_manager.session() as db:
+            marked = await MessageService(db).mark_read(
+                conversation_id=conversation_id,
+                user_id=user.id,
+                message_id=message_id,
+            )
+    except HTTPException as e:
+        conn.send({"type": "error", "message": e.detail})
+        return
+    if marked is not None:
+        await manager.broadcast(
+            conversation_id, events.read_receipt(conversation_id, user.id, marked)
+        )
+
+
+# Sockets are long-lived, so sessions are opened per handshake/frame and
+# released right away instead of pinning a pooled connection per socket.
+@ws_router.websocket("/ws/conversation/{conversation_id}")
+async def chat_ws(ws: WebSocket, conversation_id: int):
+    async with session_manager.session() as db:
+        user = await authenticate_ws(ws, db)
+        if not user:
+            return
+        is_member = await _user_in_conversation(db, conversation_id, user.id)
+
+    if not is_member:
         await ws.close(
             code=status.WS_1008_POLICY_VIOLATION, reason="User not in conversation"
         )
         return
 
-    await manager.connect(conversation_id, ws)
+    conn = await manager.connect(ws, user_id=user.id, room_ids=[conversation_id])
 
-    await ws.send_json(
+    conn.send(
         {"type": "connected", "conversation_id": conversation_id, "user_id": user.id}
     )
 
@@ -45,103 +105,83 @@ async def chat_ws(
         while True:
             incoming = await ws.receive_json()
 
-            if incoming.get("type") == "send_message":
-                content = (incoming.get("content") or "").strip()
+            kind = incoming.get("type")
 
-                raw_atts = incoming.get("attachments") or []
-                if not isinstance(raw_atts, list):
-                    await ws.send_json(
-                        {"type": "error", "message": "Invalid attachments"}
-                    )
-                    continue
-                normalized_atts = []
-                bad = False
-                for i, a in enumerate(raw_atts):
-                    if not isinstance(a, dict) or not a.get("file_path"):
-                        await ws.send_json(
-                            {"type": "error", "message": "Invalid attachment"}
-                        )
-                        bad = True
-                        break
-                    normalized_atts.append(
-                        {
-                            "file_name": a.get("file_name") or "file",
-                            "mime_type": a.get("mime"),
-                            "size_bytes": a.get("size_bytes"),
-                            "storage": a.get("storage") or "cloudinary",
-                            "file_path": a["file_path"],
-                        }
-                    )
-                if bad:
-                    continue
-                if not content and not normalized_atts:
-                    await ws.send_json(
-                        {"type": "error", "message": "Content or attachments required"}
-                    )
-                    continue
+            if kind == "send_message":
+                await _handle_send_message(conn, user, conversation_id, incoming)
+            elif kind == "read:up_to":
+                await _handle_read_up_to(conn, user, conversation_id, incoming)
+            else:
+                conn.send({"type": "echo", "data": incoming})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await manager.disconnect(conn)
 
-                reply_to_id = incoming.get("reply_to_id")
-                if reply_to_id is not None and not isinstance(reply_to_id, int):
-                    await ws.send_json(
-                        {"type": "error", "message": "Invalid reply_to_id"}
-                    )
-                    continue
 
-                msg = Message(
-                    conversation_id=conversation_id,
-                    sender_id=user.id,
-                    content=content or None,
-                    created_at=datetime.now(timezone.utc),
-                    reply_to_id=reply_to_id,
-                )
-                db.add(msg)
-                await db.commit()
-                await db.refresh(msg)
-
-                created_atts = []
-                if normalized_atts:
-                    for a in normalized_atts:
-                        att = Attachment(
-                            message_id=msg.id,
-                            file_name=a["file_name"],
-                            mime_type=a["mime_type"],
-                            size_bytes=a["size_bytes"],
-                            storage=a["storage"],
-                            file_path=a["file_path"],
+@ws_router.websocket("/ws")
+async def user_ws(ws: WebSocket):
+    async with session_manager.session() as db:
+        user = await authenticate_ws(ws, db)
+        if not user:
+            return
+        conversation_ids = await ConversationController(db).list_ids_for_user(user.id)
+
+    conn = await manager.connect(
+        ws, user_id=user.id, room_ids=conversation_ids, follow_user=True
+    )
+
+    conn.send(
+        {
+            "type": "connected",
+            "user_id": user.id,
+            "conversation_ids": conversation_ids,
+        }
+    )
+
+    try:
+        while True:
+            incoming = await ws.receive_json()
+            kind = incoming.get("type")
+            conversation_id = incoming.get("conversation_id")
+
+            if kind in (
+                "subscribe",
+                "unsubscribe",
+                "send_message",
+                "read:up_to",
+            ) and not isinstance(conversation_id, int):
+                conn.send({"type": "error", "message": "Invalid conversation_id"})
+                continue
+
+            if kind == "subscribe":
+                if conversation_id not in conn.rooms:
+                    async with session_manager.session() as db:
+                        is_member = await _user_in_conversation(
+                            db, conversation_id, user.id
                         )
-                        db.add(att)
-                        created_atts.append(att)
-                    await db.commit()
-                    for att in created_atts:
-                        await db.refresh(att)
-
-                await manager.broadcast(
-                    conversation_id,
-                    {
-                        "type": "message:new",
-                        "message": {
-                            "id": msg.id,
-                            "conversation_id": conversation_id,
-                            "sender_id": user.id,
-                            "content": msg.content,
-                            "attachments": [
-                                {
-                                    "id": att.id,
-                                    "file_name": att.file_name,
-                                    "mime_type": att.mime_type,
-                                    "size_bytes": att.size_bytes,
-                                    "storage": att.storage,
-                                    "file_path": att.file_path,
-                                }
-                                for att in created_atts
-                            ],
-                            "created_at": msg.created_at.isoformat(),
-                            "is_edited": False,
-                            "deleted": False,
-                        },
-                    },
-                )
+                    if not is_member:
+                        conn.send({"type": "error", "message": "Not in conversation"})
+                        continue
+                manager.subscribe(conn, conversation_id)
+                conn.send({"type": "subscribed", "conversation_id": conversation_id})
+            elif kind == "unsubscribe":
+                manager.unsubscribe(conn, conversation_id)
+                conn.send({"type": "unsubscribed", "conversation_id": conversation_id})
+            elif kind == "send_message":
+                # Subscribed rooms were membership-checked when joined.
+                if conversation_id not in conn.rooms:
+                    conn.send({"type": "error", "message": "Not subscribed"})
+                    continue
+                await _handle_send_message(conn, user, conversation_id, incoming)
+            elif kind == "read:up_to":
+                if conversation_id not in conn.rooms:
+                    conn.send({"type": "error", "message": "Not subscribed"})
+                    continue
+                await _handle_read_up_to(conn, user, conversation_id, incoming)
             else:
-                await ws.send_json({"type": "echo", "data": incoming})
+                conn.send({"type": "echo", "data": incoming})
     except WebSocketDisconnect:
-        await manager.disconnect(conversation_id, ws)
+        pass
+    finally:
+        await manager.disconnect(conn)
@@ -0,0 +1,31 @@
+from src.conf.config import settings
+from src.storage.base import StorageBackend
+
+
+def create_storage() -> StorageBackend:
+    kind = (settings.STORAGE_BACKEND or "cloudinary").strip().lower()
+    if kind == "cloudinary":
+        from src.storage.cloudinary_adapter import CloudinaryStorage
+
+        return CloudinaryStorage()
+    if kind == "local":
+        from src.storage.local_storage import LocalStorage
+
+        return LocalStorage(settings.LOCAL_STORAGE_DIR, settings.LOCAL_STORAGE_URL)
+    if kind == "s3":
+        from src.storage.s3_storage import S3Storage
+
+        return S3Storage(
+            bucket=settings.S3_BUCKET or "",
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            public_url=settings.S3_PUBLIC_URL,
+            chunk_bytes=max(5, int(settings.UPLOAD_CHUNK_MB)) * 1024 * 1024,
+            presign_ttl=settings.UPLOAD_PRESIGN_TTL_SECONDS,
+        )
+    raise RuntimeError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+
+
+storage = create_storage()
@@ -0,0 +1,42 @@
+import os
+import re
+import uuid
+from typing import Dict
+
+from fastapi import HTTPException, status
+
+_FOLDER_PART = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def new_object_key(folder: str, file_name: str) -> str:
+    # Client-supplied folders must never climb out of the storage root.
+    parts = [_FOLDER_PART.sub("_", p) for p in folder.split("/")]
+    parts = [p for p in parts if p.strip(".")]
+    ext = os.path.splitext(file_name)[1][:16].lower()
+    return "/".join(parts + [f"{uuid.uuid4().hex}{ext}"])
+
+
+class StorageBackend:
+    name = ""
+
+    async def save(
+        self, path: str, *, size: int, file_name: str, mime: str, folder: str
+    ) -> Dict:
+        raise NotImplementedError
+
+    async def presign(
+        self, *, folder: str, file_name: str, mime: str, max_bytes: int
+    ) -> Dict:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"Direct uploads are not supported by {self.name} storage",
+        )
+
+    async def verify(self, provider_id: str) -> Dict:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"Direct uploads are not supported by {self.name} storage",
+        )
+
+    async def discard(self, provider_id: str) -> None:
+        pass
@@ -1,15 +1,16 @@
+import mimetypes
+import time
+import uuid
 from typing import Dict, Tuple
 from urllib.parse import urlparse
-from fastapi import UploadFile, HTTPException, status
+from fastapi import HTTPException, status
 from starlette.concurrency import run_in_threadpool
+import cloudinary.api
 import cloudinary.uploader
+import cloudinary.utils
 
 from src.conf.config import settings
-
-
-def _allowed_mime_set() -> set[str]:
-    raw = settings.ALLOWED_MIME or ""
-    return {s.strip().lower() for s in raw.split(",") if s.strip()}
+from src.storage.base import StorageBackend
 
 
 def _get_cloudinary_creds() -> Tuple[str, str, str]:
@@ -32,52 +33,123 @@ def _get_cloudinary_creds() -> Tuple[str, str, str]:
     )
 
 
-async def cloudinary_upload(file: UploadFile, *, folder: str = "messenger") -> Dict:
-    allowed = _allowed_mime_set()
-    mime = (file.content_type or "application/octet-stream").strip().lower()
-    if allowed and mime not in allowed:
-        raise HTTPException(
-            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-            detail=f"Unsupported media type: {mime}",
-        )
+def _resource_mime(res: Dict) -> str:
+    # What Cloudinary detected, not what the uploader declared; raw files
+    # carry no format, only the extension kept in their public id.
+    fmt = res.get("format")
+    name = f"file.{fmt}" if fmt else res.get("public_id", "")
+    mime, _ = mimetypes.guess_type(name)
+    return mime or "application/octet-stream"
 
-    content = await file.read()
-    size = len(content)
-    if size > int(settings.MAX_UPLOAD_MB) * 1024 * 1024:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File too large (> {settings.MAX_UPLOAD_MB}MB)",
-        )
 
-    cloud_name, api_key, api_secret = _get_cloudinary_creds()
+class CloudinaryStorage(StorageBackend):
+    name = "cloudinary"
+
+    async def save(
+        self, path: str, *, size: int, file_name: str, mime: str, folder: str
+    ) -> Dict:
+        cloud_name, api_key, api_secret = _get_cloudinary_creds()
+
+        def _upload():
+            # Cloudinary rejects chunks under 5MB for chunked uploads.
+            return cloudinary.uploader.upload_large(
+                path,
+                chunk_size=max(5, int(settings.UPLOAD_CHUNK_MB)) * 1024 * 1024,
+                filename=file_name,
+                resource_type="auto",
+                folder=folder,
+                use_filename=True,
+                unique_filename=True,
+                overwrite=False,
+                cloud_name=cloud_name,
+                api_key=api_key,
+                api_secret=api_secret,
+            )
+
+        try:
+            res = await run_in_threadpool(_upload)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Cloudinary upload failed: {e}",
+            )
+
+        return {
+            "file_path": res["secure_url"],
+            "file_name": file_name or res["public_id"],
+            "mime": mime,
+            "size_bytes": res.get("bytes") or size,
+            "storage": self.name,
+            "provider_id": res["public_id"],
+            "resource_type": res.get("resource_type"),
+        }
 
-    def _upload():
-        return cloudinary.uploader.upload(
-            content,
-            resource_type="auto",
-            folder=folder,
-            use_filename=True,
-            unique_filename=True,
-            overwrite=False,
+    async def presign(
+        self, *, folder: str, file_name: str, mime: str, max_bytes: int
+    ) -> Dict:
+        cloud_name, api_key, api_secret = _get_cloudinary_creds()
+        public_id = uuid.uuid4().hex
+        if not mime.startswith(("image/", "video/")):
+            # Raw uploads keep no format, so verify() reads the type from here.
+            public_id += mimetypes.guess_extension(mime) or ""
+        params = {
+            "folder": folder,
+            "public_id": public_id,
+            "timestamp": int(time.time()),
+        }
+        signature = cloudinary.utils.api_sign_request(params, api_secret)
+        return {
+            "url": f"https://api.cloudinary.com/v1_1/{cloud_name}/auto/upload",
+            "fields": {**params, "api_key": api_key, "signature": signature},
+            "provider_id": f"{folder}/{params['public_id']}",
+            # Cloudinary accepts a signed timestamp for one hour.
+            "expires_in": 3600,
+        }
+
+    async def verify(self, provider_id: str) -> Dict:
+        cloud_name, api_key, api_secret = _get_cloudinary_creds()
+
+        def _lookup():
+            # "auto" uploads land under whichever type Cloudinary detected.
+            for resource_type in ("image", "raw", "video"):
+                try:
+                    return cloudinary.api.resource(
+                        provider_id,
+                        resource_type=resource_type,
+                        cloud_name=cloud_name,
+                        api_key=api_key,
+                        api_secret=api_secret,
+                    )
+                except cloudinary.api.NotFound:
+                    continue
+            return None
+
+        try:
+            res = await run_in_threadpool(_lookup)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Cloudinary lookup failed: {e}",
+            )
+        if res is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found"
+            )
+        return {
+            "file_path": res["secure_url"],
+            "mime": _resource_mime(res),
+            "size_bytes": res.get("bytes"),
+            "storage": self.name,
+            "provider_id": res["public_id"],
+            "resource_type": res.get("resource_type"),
+        }
+
+    async def discard(self, provider_id: str) -> None:
+        cloud_name, api_key, api_secret = _get_cloudinary_creds()
+        await run_in_threadpool(
+            cloudinary.uploader.destroy,
+            provider_id,
             cloud_name=cloud_name,
             api_key=api_key,
             api_secret=api_secret,
         )
-
-    try:
-        res = await run_in_threadpool(_upload)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Cloudinary upload failed: {e}",
-        )
-
-    return {
-        "file_path": res["secure_url"],
-        "file_name": file.filename or res["public_id"],
-        "mime": mime,
-        "size_bytes": res.get("bytes"),
-        "storage": "cloudinary",
-        "provider_id": res["public_id"],
-        "resource_type": res.get("resource_type"),
-    }
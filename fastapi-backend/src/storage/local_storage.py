@@ -0,0 +1,43 @@
+import os
+import shutil
+from typing import Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from src.storage.base import StorageBackend, new_object_key
+
+
+class LocalStorage(StorageBackend):
+    name = "local"
+
+    def __init__(self, root: str, url_prefix: str):
+        self.root = os.path.abspath(root)
+        self.url_prefix = url_prefix.rstrip("/")
+
+    def resolve(self, key: str) -> Optional[str]:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            return None
+        return path
+
+    async def save(
+        self, path: str, *, size: int, file_name: str, mime: str, folder: str
+    ) -> Dict:
+        key = new_object_key(folder, file_name)
+        target = self.resolve(key)
+
+        def _store():
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # The spool file is ours, so move it rather than copy when possible.
+            shutil.move(path, target)
+
+        await run_in_threadpool(_store)
+
+        return {
+            "file_path": f"{self.url_prefix}/{key}",
+            "file_name": file_name,
+            "mime": mime,
+            "size_bytes": size,
+            "storage": self.name,
+            "provider_id": key,
+        }
@@ -0,0 +1,127 @@
+from typing import Dict, Optional
+
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+except ImportError:  # pragma: no cover - optional dependency
+    boto3 = None
+
+from src.storage.base import StorageBackend, new_object_key
+
+
+class S3Storage(StorageBackend):
+    name = "s3"
+
+    def __init__(
+        self,
+        *,
+        bucket: str,
+        endpoint_url: Optional[str],
+        region: Optional[str],
+        access_key_id: Optional[str],
+        secret_access_key: Optional[str],
+        public_url: Optional[str],
+        chunk_bytes: int,
+        presign_ttl: int,
+    ):
+        if boto3 is None:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires the boto3 package")
+        if not bucket:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires S3_BUCKET")
+        self.bucket = bucket
+        # endpoint_url points at any S3-compatible service (MinIO locally).
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+        )
+        base = public_url or f"{self.client.meta.endpoint_url}/{bucket}"
+        self.public_url = base.rstrip("/")
+        self.presign_ttl = presign_ttl
+        self.transfer = TransferConfig(
+            multipart_threshold=chunk_bytes, multipart_chunksize=chunk_bytes
+        )
+
+    async def save(
+        self, path: str, *, size: int, file_name: str, mime: str, folder: str
+    ) -> Dict:
+        key = new_object_key(folder, file_name)
+
+        def _upload():
+            self.client.upload_file(
+                path,
+                self.bucket,
+                key,
+                ExtraArgs={"ContentType": mime},
+                Config=self.transfer,
+            )
+
+        try:
+            await run_in_threadpool(_upload)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"S3 upload failed: {e}",
+            )
+
+        return {
+            "file_path": f"{self.public_url}/{key}",
+            "file_name": file_name,
+            "mime": mime,
+            "size_bytes": size,
+            "storage": self.name,
+            "provider_id": key,
+        }
+
+    async def presign(
+        self, *, folder: str, file_name: str, mime: str, max_bytes: int
+    ) -> Dict:
+        key = new_object_key(folder, file_name)
+
+        def _presign():
+            # The policy pins the type and size, so S3 enforces them itself.
+            return self.client.generate_presigned_post(
+                self.bucket,
+                key,
+                Fields={"Content-Type": mime},
+                Conditions=[
+                    {"Content-Type": mime},
+                    ["content-length-range", 1, max_bytes],
+                ],
+                ExpiresIn=self.presign_ttl,
+            )
+
+        post = await run_in_threadpool(_presign)
+        return {
+            "url": post["url"],
+            "fields": post["fields"],
+            "provider_id": key,
+            "expires_in": self.presign_ttl,
+        }
+
+    async def verify(self, provider_id: str) -> Dict:
+        try:
+            head = await run_in_threadpool(
+                self.client.head_object, Bucket=self.bucket, Key=provider_id
+            )
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found"
+            )
+        return {
+            "file_path": f"{self.public_url}/{provider_id}",
+            "mime": head.get("ContentType"),
+            "size_bytes": head.get("ContentLength"),
+            "storage": self.name,
+            "provider_id": provider_id,
+        }
+
+    async def discard(self, provider_id: str) -> None:
+        await run_in_threadpool(
+            self.client.delete_object, Bucket=self.bucket, Key=provider_id
+        )
@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator, Iterable, Tuple
+
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.conf.config import settings
+
+READ_CHUNK_BYTES = 1024 * 1024
+
+# Caps uploads in flight per process, across all requests, so temp disk use
+# and worker threads stay bounded no matter how many files are posted.
+upload_slots = asyncio.Semaphore(max(1, settings.UPLOAD_CONCURRENCY))
+
+
+def max_upload_bytes() -> int:
+    return int(settings.MAX_UPLOAD_MB) * 1024 * 1024
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File too large (> {settings.MAX_UPLOAD_MB}MB)",
+    )
+
+
+class UploadSizeLimit:
+    # Starlette spools the whole multipart body before the endpoint runs, so
+    # the cap has to sit under the parser: a declared Content-Length is
+    # checked up front and the received bytes are counted as they arrive.
+    def __init__(self, app: ASGIApp, *, paths: Iterable[str], max_bytes: int):
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Upload too large (> {self.max_bytes // (1024 * 1024)}MB)"
+        headers = dict(scope["headers"])
+        length = headers.get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > self.max_bytes:
+            response = JSONResponse(
+                {"detail": detail},
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=detail,
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+@asynccontextmanager
+async def spool_upload(file: UploadFile) -> AsyncIterator[Tuple[str, int, str]]:
+    limit = max_upload_bytes()
+    if file.size is not None and file.size > limit:
+        raise _too_large()
+
+    fd, path = tempfile.mkstemp(prefix="upload-", dir=settings.UPLOAD_SPOOL_DIR)
+    size = 0
+    digest = hashlib.sha256()
+
+    def _write(out, chunk: bytes) -> None:
+        digest.update(chunk)
+        out.write(chunk)
+
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > limit:
+                    raise _too_large()
+                await run_in_threadpool(_write, out, chunk)
+        yield path, size, digest.hexdigest()
+    finally:
+        # A backend may have moved the file into place already.
+        with suppress(FileNotFoundError):
+            os.unlink(path)
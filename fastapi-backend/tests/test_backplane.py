@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+from sqlalchemy import select
+
+from src.models.chat_model import Message
+from src.sockets.backplane import InMemoryBackplane
+from src.sockets.hub import manager
+from src.sockets.manager import ConnectionManager
+from tests.conftest import FakeWebSocket, add_conversation, add_users
+
+
+async def _drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_broadcast_reaches_sockets_on_other_managers():
+    async def scenario():
+        backplane = InMemoryBackplane()
+        worker_a = ConnectionManager(backplane)
+        worker_b = ConnectionManager(backplane)
+        ws_a, ws_b, ws_other = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        await worker_a.connect(ws_a, user_id=1, room_ids=[7])
+        await worker_b.connect(ws_b, user_id=2, room_ids=[7])
+        await worker_b.connect(ws_other, user_id=3, room_ids=[8])
+
+        await worker_a.broadcast(7, {"type": "message:new", "message": {"id": 1}})
+        await _drain()
+        return ws_a.frames, ws_b.frames, ws_other.frames
+
+    frames_a, frames_b, frames_other = asyncio.run(scenario())
+    assert frames_a == frames_b
+    assert json.loads(frames_b[0])["message"] == {"id": 1}
+    assert frames_other == []
+
+
+def test_join_subscribes_followed_sockets_on_other_managers():
+    async def scenario():
+        backplane = InMemoryBackplane()
+        worker_a = ConnectionManager(backplane)
+        worker_b = ConnectionManager(backplane)
+        ws = FakeWebSocket()
+        conn = await worker_b.connect(ws, user_id=2, follow_user=True)
+
+        await worker_a.subscribe_user(2, 9)
+        await worker_a.broadcast(9, {"type": "message:new", "message": {"id": 5}})
+        await _drain()
+        return conn.rooms, ws.frames
+
+    rooms, frames = asyncio.run(scenario())
+    assert rooms == {9}
+    assert len(frames) == 1
+
+
+def test_lost_publish_does_not_fail_a_committed_write(client, db, act_as, monkeypatch):
+    async def seed(session):
+        alice, bob = await add_users(session, "alice", "bob")
+        conv = await add_conversation(session, alice, bob)
+        msg = Message(conversation_id=conv.id, sender_id=alice.id, content="hi")
+        session.add(msg)
+        await session.commit()
+        return alice, msg
+
+    async def content(session, message_id):
+        return await session.scalar(
+            select(Message.content).where(Message.id == message_id)
+        )
+
+    async def publish(topic, payload):
+        raise ConnectionError("backplane is down")
+
+    alice, msg = db(seed)
+    act_as(alice)
+    gaps = []
+    monkeypatch.setattr(manager.backplane, "publish", publish)
+    monkeypatch.setattr(manager.backplane, "report_gap", gaps.append)
+
+    res = client.patch(
+        f"/api/messages/{msg.id}", json={"content": "edited", "version": 1}
+    )
+    assert res.status_code == 200
+    assert db(content, msg.id) == "edited"
+    assert gaps == [f"room:{msg.conversation_id}"]
@@ -0,0 +1,105 @@
+import pytest
+from fastapi import HTTPException
+
+from src.controllers.user_controller import UserController
+from src.core.cache import TTLCache, user_cache
+from src.services.auth_service import AuthService
+from src.services.refresh_token_service import RefreshTokenService
+from tests.conftest import add_users
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_their_ttl():
+    clock = Clock()
+    cache = TTLCache(maxsize=10, ttl=30, clock=clock)
+    cache.set("a", 1)
+    cache.set("short", 2, ttl=5)
+
+    clock.now += 5
+    assert (cache.get("a"), cache.get("short")) == (1, 2)
+    clock.now += 0.1
+    assert cache.get("short") is None
+    clock.now += 25
+    assert cache.get("a") is None
+    assert cache.get("a", "default") == "default"
+
+    assert cache.stats() == {
+        "size": 0,
+        "maxsize": 10,
+        "hits": 2,
+        "misses": 3,
+        "evictions": 0,
+    }
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=30, clock=Clock())
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    cache.set("a", 10)
+    cache.set("d", 4)
+    assert cache.get("c") is None
+    assert cache.stats()["evictions"] == 2
+
+
+def test_entries_can_be_dropped_by_value():
+    cache = TTLCache(maxsize=10, ttl=30, clock=Clock())
+    for key in range(4):
+        cache.set(key, key % 2)
+    cache.pop(0)
+    cache.pop("missing")
+    cache.pop_where(lambda value: value == 1)
+    assert [cache.get(key) for key in range(4)] == [None, None, 0, None]
+    cache.set(5, 5)
+    cache.clear()
+    assert cache.stats()["size"] == 0
+
+
+def test_users_are_cached_until_they_change(db, queries):
+    async def seed(session):
+        (alice,) = await add_users(session, "alice")
+        return alice, await RefreshTokenService(session).create_access_token(
+            alice.username, alice.id
+        )
+
+    alice, token = db(seed)
+
+    async def current(session):
+        return await AuthService(session).get_current_user(token)
+
+    queries.clear()
+    assert db(current).username == "alice"
+    assert len(queries) == 1
+    assert db(current).username == "alice"
+    assert len(queries) == 1
+
+    async def rename(session):
+        users = UserController(session)
+        user = await users.get_user_by_id(alice.id)
+        user.username = "alicia"
+        await users.update(user)
+
+    db(rename)
+    assert db(current).username == "alicia"
+
+    async def delete(session):
+        users = UserController(session)
+        await users.delete(await users.get_user_by_id(alice.id))
+
+    db(delete)
+    with pytest.raises(HTTPException) as gone:
+        db(current)
+    assert gone.value.status_code == 404
+    assert user_cache.get(("id", alice.id)) is None
@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+from src.conf.config import settings
+from src.sockets.backplane import InMemoryBackplane
+from src.sockets.manager import ConnectionManager
+from tests.conftest import FakeWebSocket
+
+
+class SlowWebSocket(FakeWebSocket):
+    # Holds every frame until released, like a client that stopped reading.
+    def __init__(self):
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def send_text(self, frame: str):
+        await self.release.wait()
+        await super().send_text(frame)
+
+
+async def _drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def _ids(ws):
+    return [json.loads(frame)["message"]["id"] for frame in ws.frames]
+
+
+async def _flood(manager, count):
+    fast, slow = FakeWebSocket(), SlowWebSocket()
+    await manager.connect(fast, user_id=1, room_ids=[7])
+    await manager.connect(slow, user_id=2, room_ids=[7])
+    for i in range(count):
+        await manager.broadcast(7, {"type": "message:new", "message": {"id": i}})
+        await _drain()
+    return fast, slow
+
+
+def test_drop_oldest_keeps_the_newest_frames(monkeypatch):
+    monkeypatch.setattr(settings, "WS_SEND_QUEUE_SIZE", 2)
+    monkeypatch.setattr(settings, "WS_OVERFLOW_POLICY", "drop_oldest")
+
+    async def scenario():
+        manager = ConnectionManager(InMemoryBackplane())
+        fast, slow = await _flood(manager, 6)
+        stats = manager.stats()
+        slow.release.set()
+        await _drain()
+        return fast, slow, stats
+
+    fast, slow, stats = asyncio.run(scenario())
+    assert _ids(fast) == [0, 1, 2, 3, 4, 5]
+    # Frame 0 was already being written when the queue filled up.
+    assert _ids(slow) == [0, 4, 5]
+    assert slow.closed is None
+    assert stats["dropped_frames"] == 3
+    assert stats["max_queue_depth"] == 2
+
+
+def test_disconnect_evicts_the_slow_consumer(monkeypatch):
+    monkeypatch.setattr(settings, "WS_SEND_QUEUE_SIZE", 2)
+    monkeypatch.setattr(settings, "WS_OVERFLOW_POLICY", "disconnect")
+
+    async def scenario():
+        manager = ConnectionManager(InMemoryBackplane())
+        fast, slow = await _flood(manager, 6)
+        return fast, slow, manager.stats()
+
+    fast, slow, stats = asyncio.run(scenario())
+    assert _ids(fast) == [0, 1, 2, 3, 4, 5]
+    assert slow.closed == 1013
+    assert stats["connections"] == 1
+    assert stats["slow_disconnects"] == 1
+
+
+def test_internal_routes_need_a_token(client, monkeypatch):
+    assert client.get("/internal/ws/stats").status_code == 404
+
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "s3cret")
+    assert client.get("/internal/ws/stats").status_code == 401
+    res = client.get("/internal/ws/stats", headers={"X-Internal-Token": "s3cret"})
+    assert res.status_code == 200
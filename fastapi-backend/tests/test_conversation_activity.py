@@ -0,0 +1,89 @@
+import asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, select
+
+from src.controllers.message_controller import MessageController
+from src.database.db import session_manager
+from src.models.chat_model import Conversation, Message
+from src.services.message_service import MessageService
+from tests.conftest import add_conversation, add_users
+
+
+async def _seed(session):
+    alice, bob = await add_users(session, "alice", "bob")
+    conv = await add_conversation(session, alice, bob)
+    svc = MessageService(session)
+    ids = []
+    for text in ["m1", "m2", "m3"]:
+        msg, _ = await svc.send_message(
+            conversation_id=conv.id, sender_id=alice.id, content=text
+        )
+        ids.append(msg.id)
+    return alice, conv, ids
+
+
+async def _activity(session, conversation_id):
+    res = await session.execute(
+        select(Conversation.last_message_id, Conversation.message_count).where(
+            Conversation.id == conversation_id
+        )
+    )
+    return tuple(res.one())
+
+
+async def _delete(session, sender_id, ids):
+    result, _ = await MessageService(session).delete_message_bulk(
+        current_user_id=sender_id, ids=ids
+    )
+    return result["deleted"]
+
+
+def test_sends_and_deletes_maintain_the_counters(db):
+    alice, conv, (m1, m2, m3) = db(_seed)
+    assert db(_activity, conv.id) == (m3, 3)
+
+    db(_delete, alice.id, [m2])
+    assert db(_activity, conv.id) == (m3, 2)
+    db(_delete, alice.id, [m3])
+    assert db(_activity, conv.id) == (m1, 1)
+    db(_delete, alice.id, [m1])
+    assert db(_activity, conv.id) == (None, 0)
+
+
+def test_a_delete_does_not_rewind_a_concurrent_send(client, db):
+    alice, conv, (_, m2, m3) = db(_seed)
+
+    async def scenario():
+        async with session_manager.session() as sender:
+            # A send that has written its message and pointer but not yet
+            # committed; the delete below has to wait for its row lock.
+            res = await sender.execute(
+                insert(Message).returning(Message),
+                [
+                    {
+                        "conversation_id": conv.id,
+                        "sender_id": alice.id,
+                        "content": "m4",
+                        "created_at": datetime.now(timezone.utc),
+                    }
+                ],
+            )
+            m4 = res.scalar_one()
+            await MessageController(sender)._record_new_messages([m4])
+
+            async def delete():
+                async with session_manager.session() as session:
+                    return await _delete(session, alice.id, [m3])
+
+            deleting = asyncio.ensure_future(delete())
+            await asyncio.sleep(0.2)
+            assert not deleting.done()
+            await sender.commit()
+            assert await deleting == [m3]
+            return m4.id
+
+    m4 = client.portal.call(scenario)
+    assert db(_activity, conv.id) == (m4, 3)
+    db(_delete, alice.id, [m4])
+    assert db(_activity, conv.id) == (m2, 2)
@@ -0,0 +1,119 @@
+import itertools
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from src.models.chat_model import Conversation
+from src.services.conversation_service import decode_cursor, encode_cursor
+from tests.conftest import add_users
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_cursor_round_trips():
+    at = datetime(2026, 3, 4, 5, 6, 7, 891011, tzinfo=timezone.utc)
+    cursor = encode_cursor(at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (at, 42)
+
+
+@pytest.mark.parametrize(
+    "cursor", ["", "not base64!", "bm8tc2VwYXJhdG9y", "MjAyNnw0Mg", "w7w"]
+)
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+async def _seed(session):
+    # Half of the peers sort before alice, so she sits in both columns.
+    names = [f"p{i:02}" for i in range(12)] + ["alice"]
+    names += [f"q{i:02}" for i in range(12)]
+    users = await add_users(session, *names)
+    alice = users[12]
+    peers = users[:12] + users[13:]
+    for i, peer in enumerate(peers):
+        u1, u2 = sorted([alice.id, peer.id])
+        # Pairs share an activity time so the id breaks the tie.
+        at = T0 + timedelta(minutes=i // 2) if i % 5 else None
+        session.add(
+            Conversation(user1_id=u1, user2_id=u2, last_message_at=at, created_at=T0)
+        )
+    await session.commit()
+    return alice, users
+
+
+def _expected(client):
+    res = client.get("/api/conversations", params={"limit": 200})
+    assert res.status_code == 200
+    assert "X-Next-Cursor" not in res.headers
+    return [c["id"] for c in res.json()]
+
+
+def _walk(client, limit, on_page=None):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        res = client.get("/api/conversations", params=params)
+        assert res.status_code == 200
+        seen += [c["id"] for c in res.json()]
+        cursor = res.headers.get("X-Next-Cursor")
+        if on_page:
+            on_page()
+        if not cursor:
+            return seen
+
+
+def test_keyset_pages_cover_the_inbox_once(client, db, act_as):
+    alice, _ = db(_seed)
+    act_as(alice)
+    expected = _expected(client)
+    assert len(expected) == 24
+
+    activity = [
+        (c["last_activity_at"], c["id"])
+        for c in client.get("/api/conversations", params={"limit": 200}).json()
+    ]
+    assert activity == sorted(activity, reverse=True)
+
+    assert _walk(client, 5) == expected
+    assert _walk(client, 6) == expected
+    offsets = [
+        c["id"]
+        for offset in range(0, 24, 5)
+        for c in client.get(
+            "/api/conversations", params={"limit": 5, "offset": offset}
+        ).json()
+    ]
+    assert offsets == expected
+
+
+def test_new_conversations_do_not_shift_a_scroll(client, db, act_as):
+    alice, users = db(_seed)
+    act_as(alice)
+    expected = _expected(client)
+    late = itertools.count()
+
+    async def add_newest(session):
+        extra = await add_users(session, f"late{next(late)}")
+        session.add(
+            Conversation(
+                user1_id=alice.id,
+                user2_id=extra[0].id,
+                created_at=T0 + timedelta(days=1),
+            )
+        )
+        await session.commit()
+
+    assert _walk(client, 5, on_page=lambda: db(add_newest)) == expected
+
+
+def test_malformed_cursor_is_a_bad_request(client, db, act_as):
+    alice, _ = db(_seed)
+    act_as(alice)
+    res = client.get("/api/conversations", params={"cursor": "garbage"})
+    assert res.status_code == 400
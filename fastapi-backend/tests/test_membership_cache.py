@@ -0,0 +1,89 @@
+import time
+
+from sqlalchemy import text
+
+from src.controllers.conversation_controller import ConversationController
+from src.controllers.user_controller import UserController
+from src.core.cache import membership_cache
+from src.models.chat_model import Conversation
+from tests.conftest import add_conversation, add_users
+
+MEMBERSHIP_SQL = "SELECT conversations.user1_id, conversations.user2_id"
+
+
+def _lookups(queries):
+    return sum(q.startswith(MEMBERSHIP_SQL) for q in queries)
+
+
+def _history(client, conversation_id):
+    return client.get(f"/api/conversations/{conversation_id}/messages").status_code
+
+
+async def _seed(session):
+    alice, bob, carol = await add_users(session, "alice", "bob", "carol")
+    return alice, bob, carol, await add_conversation(session, alice, bob)
+
+
+def test_membership_is_looked_up_once(client, db, act_as, queries):
+    alice, bob, carol, conv = db(_seed)
+    queries.clear()
+
+    act_as(alice)
+    assert [_history(client, conv.id) for _ in range(3)] == [200] * 3
+    act_as(bob)
+    assert _history(client, conv.id) == 200
+    act_as(carol)
+    assert _history(client, conv.id) == 403
+    assert _lookups(queries) == 1
+
+
+def test_missing_conversations_are_cached_briefly(
+    client, db, act_as, queries, monkeypatch
+):
+    now = [time.monotonic()]
+    monkeypatch.setattr(membership_cache, "clock", lambda: now[0])
+    alice, _, carol, _ = db(_seed)
+
+    async def reserve_id(session):
+        return await session.scalar(text("SELECT nextval('conversations_id_seq')"))
+
+    async def create(session, conversation_id):
+        # Written behind the controller's back, so nothing invalidates.
+        session.add(
+            Conversation(id=conversation_id, user1_id=alice.id, user2_id=carol.id)
+        )
+        await session.commit()
+
+    missing = db(reserve_id)
+    act_as(alice)
+    queries.clear()
+    assert _history(client, missing) == 403
+    db(create, missing)
+    assert _history(client, missing) == 403
+    assert _lookups(queries) == 1
+
+    now[0] += 5.1
+    assert _history(client, missing) == 200
+    assert _lookups(queries) == 2
+
+
+def test_deletes_invalidate_memberships(client, db, act_as, queries):
+    alice, bob, carol, conv = db(_seed)
+    other = db(add_conversation, alice, carol)
+    act_as(alice)
+    assert (_history(client, conv.id), _history(client, other.id)) == (200, 200)
+
+    async def delete_conversation(session):
+        controller = ConversationController(session)
+        await controller.delete(await controller.get_by_id(conv.id))
+
+    async def delete_user(session):
+        users = UserController(session)
+        await users.delete(await users.get_user_by_id(carol.id))
+
+    db(delete_conversation)
+    db(delete_user)
+    assert membership_cache.get(other.id) is None
+    queries.clear()
+    assert (_history(client, conv.id), _history(client, other.id)) == (403, 403)
+    assert _lookups(queries) == 2
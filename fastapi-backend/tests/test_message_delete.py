@@ -0,0 +1,69 @@
+from sqlalchemy import select
+
+from src.models.chat_model import Message
+from src.services.message_service import MessageService
+from tests.conftest import add_conversation, add_users
+
+
+async def _seed(session):
+    alice, bob, carol = await add_users(session, "alice", "bob", "carol")
+    first = await add_conversation(session, alice, bob)
+    second = await add_conversation(session, alice, carol)
+    svc = MessageService(session)
+    ids = {}
+    for name, sender, conv in [
+        ("a1", alice, first),
+        ("a2", alice, first),
+        ("a3", alice, second),
+        ("b1", bob, first),
+    ]:
+        msg, _ = await svc.send_message(
+            conversation_id=conv.id, sender_id=sender.id, content=name
+        )
+        ids[name] = msg.id
+    return alice, first, second, ids
+
+
+def _delete(client, ids):
+    return client.request("DELETE", "/api/messages/bulk", json={"ids": ids})
+
+
+def test_bulk_delete_splits_forbidden_and_missing(client, db, act_as, broadcasts):
+    async def live(session):
+        res = await session.execute(
+            select(Message.content)
+            .where(Message.deleted_at.is_(None))
+            .order_by(Message.id)
+        )
+        return res.scalars().all()
+
+    alice, first, second, ids = db(_seed)
+    act_as(alice)
+    missing = ids["b1"] + 1000
+
+    res = _delete(client, [ids["a3"], ids["b1"], missing, ids["a1"], ids["a2"]])
+    assert res.status_code == 200
+    assert res.json() == {
+        "deleted": sorted([ids["a1"], ids["a2"], ids["a3"]]),
+        "forbidden": [ids["b1"]],
+        "not_found": [missing],
+    }
+    assert db(live) == ["b1"]
+    assert sorted((cid, data["message_ids"]) for cid, data in broadcasts) == [
+        (first.id, sorted([ids["a1"], ids["a2"]])),
+        (second.id, [ids["a3"]]),
+    ]
+
+
+def test_deleting_again_changes_nothing(client, db, act_as, broadcasts):
+    alice, _, _, ids = db(_seed)
+    act_as(alice)
+    assert _delete(client, [ids["a1"]]).json()["deleted"] == [ids["a1"]]
+
+    res = _delete(client, [ids["a1"]])
+    assert res.json() == {"deleted": [], "forbidden": [], "not_found": []}
+    assert len(broadcasts) == 1
+
+
+def test_bulk_delete_needs_ids(client):
+    assert _delete(client, []).status_code == 422
@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+
+from src.models.chat_model import Message
+from tests.conftest import add_conversation, add_users
+
+
+async def _seed(session):
+    alice, bob = await add_users(session, "alice", "bob")
+    conv = await add_conversation(session, alice, bob)
+    live = Message(conversation_id=conv.id, sender_id=alice.id, content="hi")
+    gone = Message(
+        conversation_id=conv.id,
+        sender_id=alice.id,
+        content="bye",
+        deleted_at=datetime.now(timezone.utc),
+    )
+    session.add_all([live, gone])
+    await session.commit()
+    return alice, bob, live, gone
+
+
+def _edit(client, message_id, content, version):
+    return client.patch(
+        f"/api/messages/{message_id}", json={"content": content, "version": version}
+    )
+
+
+def test_edit_bumps_the_version(client, db, act_as):
+    alice, _, live, _ = db(_seed)
+    act_as(alice)
+
+    res = _edit(client, live.id, "edited", 1)
+    assert res.status_code == 200
+    assert res.json()["version"] == 2
+    assert res.json()["is_edited"] is True
+
+    res = _edit(client, live.id, "again", 2)
+    assert res.json()["version"] == 3
+
+
+def test_stale_version_conflicts(client, db, act_as):
+    alice, _, live, _ = db(_seed)
+    act_as(alice)
+    assert _edit(client, live.id, "first", 1).status_code == 200
+
+    res = _edit(client, live.id, "second", 1)
+    assert res.status_code == 409
+    assert "version 2" in res.json()["detail"]
+
+
+def test_only_the_author_can_edit(client, db, act_as):
+    _, bob, live, _ = db(_seed)
+    act_as(bob)
+    assert _edit(client, live.id, "mine now", 1).status_code == 403
+
+
+def test_missing_and_deleted_messages_are_not_found(client, db, act_as):
+    alice, _, live, gone = db(_seed)
+    act_as(alice)
+    assert _edit(client, gone.id, "back", 1).status_code == 404
+    assert _edit(client, live.id + 1000, "who", 1).status_code == 404
+
+
+def test_version_is_required(client):
+    res = client.patch("/api/messages/1", json={"content": "no version"})
+    assert res.status_code == 422
@@ -0,0 +1,98 @@
+import json
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+
+from src.controllers.message_controller import MessageController
+from src.models.chat_model import Conversation, Message
+
+SEED = """
+INSERT INTO users (username, email, hashed_password, created_at, updated_at)
+SELECT 'u' || g, 'u' || g || '@x', 'x', now(), now()
+FROM generate_series(1, 201) g;
+INSERT INTO conversations (user1_id, user2_id, created_at)
+SELECT first.id, u.id, now()
+FROM users u, (SELECT min(id) AS id FROM users) first
+WHERE u.id <> first.id;
+INSERT INTO messages
+    (conversation_id, sender_id, content, created_at, updated_at, is_edited,
+     deleted_at)
+SELECT c.first + g % 200, u.first, 'm', now(), now(), false,
+       CASE WHEN g % 10 = 0 THEN now() END
+FROM generate_series(1, 200000) g,
+     (SELECT min(id) AS first FROM conversations) c,
+     (SELECT min(id) AS first FROM users) u;
+ANALYZE
+"""
+
+
+class _Capture:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return self
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+
+async def _history_sql(conversation_id, **kwargs) -> str:
+    capture = _Capture()
+    await MessageController(capture).list_for_conversation(
+        conversation_id, limit=50, **kwargs
+    )
+    return str(
+        capture.statements[0].compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+def _nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+async def _seed(session):
+    for stmt in SEED.split(";"):
+        await session.execute(text(stmt))
+    await session.commit()
+    conv = await session.scalar(select(func.min(Conversation.id) + 7))
+    first = await session.scalar(select(func.min(Message.id)))
+    return conv, first
+
+
+async def _plans(session, queries):
+    plans = []
+    for sql in queries:
+        plan = await session.scalar(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        plans.append(plan[0]["Plan"])
+    return plans
+
+
+def test_history_pages_walk_the_live_index_without_sorting(client, db):
+    conv, first = db(_seed)
+
+    async def queries():
+        return [
+            await _history_sql(conv),
+            await _history_sql(conv, before_id=first + 150000),
+            await _history_sql(conv, after_id=first + 1000),
+        ]
+
+    queries = client.portal.call(queries)
+    plans = db(_plans, queries)
+    for sql, plan in zip(queries, plans):
+        nodes = list(_nodes(plan))
+        assert any(
+            n.get("Index Name") == "ix_messages_conversation_live" for n in nodes
+        ), sql
+        assert not any(n["Node Type"] == "Sort" for n in nodes), sql
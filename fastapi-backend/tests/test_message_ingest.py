@@ -0,0 +1,123 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from src.services.message_ingest import MessageIngest
+from tests.conftest import add_conversation, add_users
+
+
+def _values(conv, sender_id, content):
+    return {
+        "conversation_id": conv.id,
+        "sender_id": sender_id,
+        "content": content,
+        "created_at": datetime.now(timezone.utc),
+        "reply_to_id": None,
+    }
+
+
+async def _seed(session):
+    alice, bob, carol = await add_users(session, "alice", "bob", "carol")
+    first = await add_conversation(session, alice, bob)
+    second = await add_conversation(session, alice, carol)
+    return alice, first, second
+
+
+def _ingest(delivered, **kwargs):
+    async def on_persisted(msg, atts):
+        delivered.append(msg)
+
+    kwargs.setdefault("max_batch", 50)
+    kwargs.setdefault("max_delay_ms", 20)
+    kwargs.setdefault("max_pending", 100)
+    return MessageIngest(on_persisted=on_persisted, **kwargs)
+
+
+def test_messages_are_batched_and_kept_in_order(client, db):
+    alice, first, second = db(_seed)
+    delivered = []
+    ingest = _ingest(delivered, max_batch=3)
+    sent = [(first if i % 2 else second, f"m{i}") for i in range(7)]
+
+    async def scenario():
+        await ingest.start()
+        try:
+            return await asyncio.gather(
+                *(
+                    ingest.submit(_values(conv, alice.id, text), [])
+                    for conv, text in sent
+                )
+            )
+        finally:
+            await ingest.stop()
+
+    results = client.portal.call(scenario)
+    assert [msg.content for msg, _ in results] == [text for _, text in sent]
+    assert [msg.conversation_id for msg, _ in results] == [c.id for c, _ in sent]
+    ids = [msg.id for msg, _ in results]
+    assert ids == sorted(ids)
+    assert [msg.id for msg in delivered] == ids
+    assert ingest.stats()["batches"] == 3
+    assert ingest.stats()["messages"] == 7
+
+
+def test_a_bad_row_fails_alone(client, db):
+    alice, first, _ = db(_seed)
+    delivered = []
+    ingest = _ingest(delivered)
+
+    async def scenario():
+        await ingest.start()
+        try:
+            return await asyncio.gather(
+                ingest.submit(_values(first, alice.id, "before"), []),
+                ingest.submit(_values(first, alice.id + 1000, "no sender"), []),
+                ingest.submit(_values(first, alice.id, "after"), []),
+                return_exceptions=True,
+            )
+        finally:
+            await ingest.stop()
+
+    before, bad, after = client.portal.call(scenario)
+    assert isinstance(bad, Exception)
+    assert [before[0].content, after[0].content] == ["before", "after"]
+    assert [msg.content for msg in delivered] == ["before", "after"]
+
+
+def test_full_queue_and_stopped_worker_fail_fast(client, db, monkeypatch):
+    alice, first, _ = db(_seed)
+    ingest = _ingest([], max_batch=1, max_pending=1)
+    release = asyncio.Event()
+    persist = ingest._persist
+
+    async def slow_persist(items):
+        await release.wait()
+        return await persist(items)
+
+    monkeypatch.setattr(ingest, "_persist", slow_persist)
+
+    async def scenario():
+        with pytest.raises(HTTPException) as not_started:
+            await ingest.submit(_values(first, alice.id, "early"), [])
+
+        await ingest.start()
+        held = asyncio.ensure_future(ingest.submit(_values(first, alice.id, "1"), []))
+        await asyncio.sleep(0.05)
+        queued = asyncio.ensure_future(ingest.submit(_values(first, alice.id, "2"), []))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as full:
+            await ingest.submit(_values(first, alice.id, "3"), [])
+
+        release.set()
+        done = [msg.content for msg, _ in await asyncio.gather(held, queued)]
+        await ingest.stop()
+        with pytest.raises(HTTPException) as stopped:
+            await ingest.submit(_values(first, alice.id, "late"), [])
+        return not_started.value, full.value, stopped.value, done
+
+    not_started, full, stopped, done = client.portal.call(scenario)
+    assert not_started.status_code == full.status_code == stopped.status_code == 503
+    assert done == ["1", "2"]
+    assert ingest.stats()["rejected"] == 1
@@ -0,0 +1,77 @@
+from src.controllers.stored_object_controller import StoredObjectController
+from src.models.chat_model import StoredObject
+from src.services.message_service import MessageService
+from src.services.message_tail import message_tail
+from src.sockets import events, hub
+from tests.conftest import add_conversation, add_users
+
+PREVIEWS = {
+    "thumbnails": [{"size": 64, "url": "thumbs/64.webp", "width": 64, "height": 48}],
+    "lqip": "data:image/webp;base64,AAAA",
+}
+
+
+def _attachment(name: str) -> dict:
+    return {"file_name": name, "mime": "image/png", "size_bytes": 3}
+
+
+def test_tail_pages_match_database_pages(client, db, act_as, monkeypatch):
+    async def seed(session):
+        alice, bob = await add_users(session, "alice", "bob")
+        conv = await add_conversation(session, alice, bob)
+        session.add_all(
+            StoredObject(
+                sha256=name * 64,
+                storage="local",
+                size_bytes=3,
+                mime_type="image/png",
+                file_path=f"chat/{name}.png",
+                previews=PREVIEWS if name == "a" else None,
+            )
+            for name in ("a", "b")
+        )
+        await session.commit()
+        return alice, conv
+
+    async def send(session, sender, conv, name):
+        att = {**_attachment(name), "storage": "local", "file_path": f"chat/{name}.png"}
+        msg, atts = await MessageService(session).send_message(
+            conversation_id=conv.id,
+            sender_id=sender.id,
+            content=f"with {name}",
+            attachments=[att],
+        )
+        # What the ingest worker publishes once a batch has committed.
+        await hub.manager.broadcast(conv.id, events.message_new(msg, atts))
+
+    async def store_previews(session, sha256):
+        await StoredObjectController(session).set_previews(sha256, "local", PREVIEWS)
+        await hub._previews_ready(sha256)
+
+    def page(conv):
+        res = client.get(f"/api/conversations/{conv.id}/messages")
+        assert res.status_code == 200
+        return res.json()
+
+    def database_page(conv):
+        message_tail.reset(f"room:{conv.id}")
+        return page(conv)
+
+    monkeypatch.setattr(message_tail, "enabled", True)
+    alice, conv = db(seed)
+    act_as(alice)
+    assert page(conv) == []
+
+    db(send, alice, conv, "a")
+    db(send, alice, conv, "b")
+    hits = message_tail.hits
+    served = page(conv)
+    assert message_tail.hits == hits + 1
+    assert served == database_page(conv)
+    assert served[0]["attachments"][0]["lqip"] == PREVIEWS["lqip"]
+    assert served[1]["attachments"][0]["lqip"] is None
+
+    db(store_previews, "b" * 64)
+    served = page(conv)
+    assert served[1]["attachments"][0]["thumbnails"] == PREVIEWS["thumbnails"]
+    assert served == database_page(conv)
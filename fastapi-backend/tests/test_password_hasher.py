@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+
+import bcrypt
+import pytest
+from fastapi import HTTPException
+
+from src.database.db import session_manager
+from src.models.user_model import User
+from src.services.password_hasher import PasswordHasher, password_hasher
+
+
+def test_requests_over_the_cap_are_rejected():
+    hasher = PasswordHasher(max_workers=1, max_pending=2)
+    release = threading.Event()
+
+    async def scenario():
+        held = [
+            asyncio.ensure_future(hasher._run(lambda i=i: release.wait(5) and i))
+            for i in range(2)
+        ]
+        await asyncio.sleep(0.05)
+        busy = hasher.stats()
+        with pytest.raises(HTTPException) as over:
+            await hasher._run(lambda: "late")
+        release.set()
+        return await asyncio.gather(*held), busy, over.value
+
+    try:
+        done, busy, over = asyncio.run(scenario())
+    finally:
+        hasher.shutdown()
+
+    assert done == [0, 1]
+    assert (busy["pending"], busy["queued"]) == (2, 1)
+    assert over.status_code == 503
+    stats = hasher.stats()
+    assert (stats["pending"], stats["completed"], stats["rejected"]) == (0, 2, 1)
+    assert stats["max_wait_ms"] > 0
+
+
+def test_hashing_does_not_stall_the_event_loop():
+    hasher = PasswordHasher(max_workers=2, max_pending=64)
+    stored = bcrypt.hashpw(b"secret", bcrypt.gensalt()).decode()
+
+    async def lag_while(work):
+        lags, done = [], False
+
+        async def ticker():
+            while not done:
+                start = time.perf_counter()
+                await asyncio.sleep(0.005)
+                lags.append(time.perf_counter() - start - 0.005)
+
+        tick = asyncio.ensure_future(ticker())
+        started = time.perf_counter()
+        results = await work()
+        elapsed = time.perf_counter() - started
+        done = True
+        await tick
+        return results, max(lags), elapsed
+
+    async def scenario():
+        return await lag_while(
+            lambda: asyncio.gather(
+                *(hasher.verify("secret", stored) for _ in range(3)),
+                hasher.hash("other"),
+            )
+        )
+
+    try:
+        results, max_lag, elapsed = asyncio.run(scenario())
+    finally:
+        hasher.shutdown()
+
+    assert results[:3] == [True] * 3
+    assert bcrypt.checkpw(b"other", results[3].encode())
+    # Four hashes ran; run inline, any one of them would stall the loop
+    # for its whole duration.
+    assert max_lag < elapsed / 4 / 2
+
+
+def test_logins_hash_without_holding_a_connection(client, db, monkeypatch):
+    async def seed(session):
+        hashed = bcrypt.hashpw(b"secret", bcrypt.gensalt(4)).decode()
+        session.add(User(username="alice", email="alice@x.io", hashed_password=hashed))
+        await session.commit()
+
+    db(seed)
+    held = []
+    verify = password_hasher.verify
+
+    async def watched(password, hashed_password):
+        held.append(session_manager.engine.pool.checkedout())
+        return await verify(password, hashed_password)
+
+    monkeypatch.setattr(password_hasher, "verify", watched)
+    res = client.post(
+        "/api/auth/login", data={"username": "alice@x.io", "password": "secret"}
+    )
+    assert res.status_code == 200
+    assert held == [0]
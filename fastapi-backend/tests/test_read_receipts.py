@@ -0,0 +1,116 @@
+from sqlalchemy import select
+
+from src.controllers.conversation_read_controller import ConversationReadController
+from src.models.chat_model import ConversationRead
+from src.services.message_service import MessageService
+from src.services.read_receipts import ReadReceiptBuffer
+from tests.conftest import add_conversation, add_users
+
+
+async def _seed(session, messages=2):
+    alice, bob, carol = await add_users(session, "alice", "bob", "carol")
+    conv = await add_conversation(session, alice, bob)
+    ids = []
+    for i in range(messages):
+        msg, _ = await MessageService(session).send_message(
+            conversation_id=conv.id, sender_id=bob.id, content=f"m{i}"
+        )
+        ids.append(msg.id)
+    return alice, carol, conv, ids
+
+
+def _read(client, conv, message_id):
+    return client.post(
+        f"/api/conversations/{conv.id}/read", json={"message_id": message_id}
+    )
+
+
+def test_marks_past_the_newest_message_are_clamped(client, db, act_as, broadcasts):
+    alice, _, conv, ids = db(_seed)
+    act_as(alice)
+
+    assert _read(client, conv, ids[-1] + 1000).status_code == 204
+    assert broadcasts == [
+        (
+            conv.id,
+            {
+                "type": "read:receipt",
+                "conversation_id": conv.id,
+                "user_id": alice.id,
+                "message_id": ids[-1],
+            },
+        )
+    ]
+
+
+def test_marks_that_do_not_advance_are_silent(client, db, act_as, broadcasts):
+    alice, _, conv, ids = db(_seed)
+    act_as(alice)
+
+    assert _read(client, conv, ids[1]).status_code == 204
+    assert _read(client, conv, ids[0]).status_code == 204
+    assert _read(client, conv, ids[1]).status_code == 204
+    assert [data["message_id"] for _, data in broadcasts] == [ids[1]]
+
+
+def test_empty_conversations_have_nothing_to_read(client, db, act_as, broadcasts):
+    alice, _, conv, _ = db(_seed, 0)
+    act_as(alice)
+
+    assert _read(client, conv, 5).status_code == 204
+    assert broadcasts == []
+
+
+def test_only_members_can_mark(client, db, act_as, broadcasts):
+    _, carol, conv, ids = db(_seed)
+    act_as(carol)
+
+    assert _read(client, conv, ids[0]).status_code == 403
+    assert _read(client, conv, 0).status_code == 422
+    assert broadcasts == []
+
+
+def test_buffer_coalesces_and_saves_the_highest_mark(client, db):
+    async def stored(session, conv):
+        res = await session.execute(
+            select(ConversationRead.user_id, ConversationRead.last_read_message_id)
+            .where(ConversationRead.conversation_id == conv.id)
+            .order_by(ConversationRead.user_id)
+        )
+        return res.all()
+
+    alice, carol, conv, ids = db(_seed, 3)
+    buffer = ReadReceiptBuffer(flush_interval_ms=1000, max_pending=100)
+
+    assert buffer.mark(alice.id, conv.id, ids[0])
+    assert buffer.mark(alice.id, conv.id, ids[2])
+    assert not buffer.mark(alice.id, conv.id, ids[1])
+    assert buffer.stats()["pending"] == 1
+    client.portal.call(buffer.flush)
+    assert db(stored, conv) == [(alice.id, ids[2])]
+
+    # A mark the table is already past never moves it back.
+    other = ReadReceiptBuffer(flush_interval_ms=1000, max_pending=100)
+    other.mark(alice.id, conv.id, ids[1])
+    client.portal.call(other.flush)
+    assert db(stored, conv) == [(alice.id, ids[2])]
+    assert buffer.stats()["flushed_rows"] == 1
+
+
+def test_failed_flush_keeps_the_marks(client, db, monkeypatch):
+    async def fail(self, rows):
+        raise ConnectionError("database is down")
+
+    alice, _, conv, ids = db(_seed)
+    buffer = ReadReceiptBuffer(flush_interval_ms=1000, max_pending=100)
+    buffer.mark(alice.id, conv.id, ids[0])
+
+    monkeypatch.setattr(ConversationReadController, "upsert_many", fail)
+    client.portal.call(buffer.flush)
+    assert buffer.stats()["pending"] == 1
+    assert buffer.stats()["flushes"] == 0
+
+    monkeypatch.undo()
+    client.portal.call(buffer.flush)
+    assert buffer.stats()["pending"] == 0
+    assert buffer.stats()["flushes"] == 1
@@ -0,0 +1,31 @@
+from typing import List
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from src.storage.spool import UploadSizeLimit
+
+
+def test_upload_size_limit_rejects_before_parsing():
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimit, paths={"/up"}, max_bytes=1024)
+
+    @app.post("/up")
+    async def up(files: List[UploadFile] = File(...)):
+        return [f.size for f in files]
+
+    client = TestClient(app)
+    assert client.post("/up", files=[("files", ("a", b"x" * 100))]).json() == [100]
+    res = client.post("/up", files=[("files", ("a", b"x" * 4096))])
+    assert res.status_code == 413
+
+    def chunked():
+        for _ in range(8):
+            yield b"x" * 512
+
+    res = client.post(
+        "/up",
+        content=chunked(),
+        headers={"content-type": "multipart/form-data; boundary=x"},
+    )
+    assert res.status_code == 413
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.routers import media_routers
+from src.storage.local_storage import LocalStorage
+
+
+@pytest.fixture
+def local(tmp_path, monkeypatch):
+    backend = LocalStorage(str(tmp_path / "media"), "/media")
+    monkeypatch.setattr(media_routers, "storage", backend)
+    return backend
+
+
+def _save(backend, tmp_path, body: bytes):
+    src = tmp_path / "upload.part"
+    src.write_bytes(body)
+    return asyncio.run(
+        backend.save(
+            str(src),
+            size=len(body),
+            file_name="notes.txt",
+            mime="text/plain",
+            folder="users/1",
+        )
+    )
+
+
+def test_local_files_are_served_with_validators(client, local, tmp_path):
+    meta = _save(local, tmp_path, b"hello")
+    assert meta["file_path"].startswith("/media/users/1/")
+
+    res = client.get(meta["file_path"])
+    assert res.status_code == 200
+    assert res.content == b"hello"
+    assert "immutable" in res.headers["cache-control"]
+
+    res = client.get(meta["file_path"], headers={"if-none-match": res.headers["etag"]})
+    assert res.status_code == 304
+    res = client.get(meta["file_path"], headers={"range": "bytes=1-3"})
+    assert res.status_code == 206
+    assert res.content == b"ell"
+
+
+def test_only_regular_files_inside_the_root_are_served(client, local, tmp_path):
+    meta = _save(local, tmp_path, b"hello")
+    (tmp_path / "secret.txt").write_text("secret")
+
+    assert client.get("/media/users/1").status_code == 404
+    assert client.get(meta["file_path"] + "/x").status_code == 404
+    assert client.get("/media/users/1/missing.txt").status_code == 404
+    assert client.get("/media/%2e%2e/secret.txt").status_code == 404
+
+
+def test_s3_save_streams_to_the_bucket(tmp_path):
+    pytest.importorskip("boto3")
+    from botocore.stub import ANY, Stubber
+
+    from src.storage.s3_storage import S3Storage
+
+    backend = S3Storage(
+        bucket="chat",
+        endpoint_url="http://s3.test",
+        region="us-east-1",
+        access_key_id="key",
+        secret_access_key="secret",
+        public_url=None,
+        chunk_bytes=8 * 1024 * 1024,
+        presign_ttl=60,
+    )
+    with Stubber(backend.client) as stub:
+        stub.add_response(
+            "put_object",
+            {"ETag": '"etag"'},
+            {
+                "Bucket": "chat",
+                "Key": ANY,
+                "Body": ANY,
+                "ContentType": "text/plain",
+                "ChecksumAlgorithm": ANY,
+            },
+        )
+        meta = _save(backend, tmp_path, b"hello")
+        stub.assert_no_pending_responses()
+
+        stub.add_client_error("put_object", http_status_code=503)
+        with pytest.raises(HTTPException) as failed:
+            _save(backend, tmp_path, b"hello")
+
+    assert meta["storage"] == "s3"
+    assert meta["provider_id"].startswith("users/1/")
+    assert meta["file_path"] == f"http://s3.test/chat/{meta['provider_id']}"
+    assert failed.value.status_code == 502
@@ -0,0 +1,44 @@
+import hashlib
+
+import pytest
+
+from src.services.upload_service import upload_service
+from src.storage.local_storage import LocalStorage
+
+
+@pytest.fixture
+def storage_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        upload_service, "backend", LocalStorage(str(tmp_path), "/media")
+    )
+    return tmp_path
+
+
+def _upload(client, name, body):
+    res = client.post("/api/upload", files=[("files", (name, body, "text/plain"))])
+    assert res.status_code == 200
+    return res.json()[0]
+
+
+def test_identical_bytes_are_stored_once(client, db, storage_dir):
+    body = b"same bytes"
+    first = _upload(client, "a.txt", body)
+    second = _upload(client, "b.txt", body)
+
+    assert first["sha256"] == second["sha256"] == hashlib.sha256(body).hexdigest()
+    assert second["file_path"] == first["file_path"]
+    assert second["file_name"] == "b.txt"
+    assert len([p for p in storage_dir.rglob("*") if p.is_file()]) == 1
+
+    other = _upload(client, "c.txt", b"other bytes")
+    assert other["file_path"] != first["file_path"]
+
+
+def test_object_lookup_only_reports_existence(client, db, storage_dir):
+    digest = _upload(client, "a.txt", b"known")["sha256"]
+
+    res = client.get(f"/api/upload/objects/{digest.upper()}")
+    assert res.json() == {"sha256": digest, "exists": True}
+    res = client.get(f"/api/upload/objects/{'ab' * 32}")
+    assert res.json() == {"sha256": "ab" * 32, "exists": False}
+    assert client.get("/api/upload/objects/nope").status_code == 422
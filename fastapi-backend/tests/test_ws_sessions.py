@@ -0,0 +1,48 @@
+import jwt
+from sqlalchemy import event
+
+from src.conf.config import settings
+from src.database.db import session_manager
+from tests.conftest import add_conversation, add_users
+
+
+def _token(user) -> str:
+    return jwt.encode(
+        {"sub": user.username}, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+    )
+
+
+def test_idle_sockets_do_not_pin_pool_connections(client, db):
+    async def seed(session):
+        alice, bob, carol = await add_users(session, "alice", "bob", "carol")
+        conv = await add_conversation(session, alice, bob)
+        return alice, bob, carol, conv
+
+    alice, bob, carol, conv = db(seed)
+    pool = session_manager.engine.sync_engine.pool
+    checkouts = []
+
+    def on_checkout(*args):
+        checkouts.append(1)
+
+    event.listen(pool, "checkout", on_checkout)
+    try:
+        room = f"/ws/conversation/{conv.id}?token="
+        with client.websocket_connect(room + _token(alice)) as a:
+            assert a.receive_json()["type"] == "connected"
+            with client.websocket_connect(room + _token(bob)) as b:
+                assert b.receive_json()["type"] == "connected"
+                with client.websocket_connect(f"/ws?token={_token(carol)}") as c:
+                    assert c.receive_json()["type"] == "connected"
+                    # One short session per handshake, none held afterwards.
+                    assert len(checkouts) == 3
+                    assert pool.checkedout() == 0
+
+                    a.send_json({"type": "ping"})
+                    assert a.receive_json()["type"] == "echo"
+                    a.send_json({"type": "send_message", "content": "hi"})
+                    assert b.receive_json()["message"]["content"] == "hi"
+                    assert len(checkouts) == 4
+                    assert pool.checkedout() == 0
+    finally:
+        event.remove(pool, "checkout", on_checkout)
@@ -20,9 +20,11 @@ export async function fetchMessages(
 
 export async function editMessage(
   messageId: number,
-  content: string
+  content: string,
+  version: number
 ): Promise<Message> {
-  const res = await http.patch(`/messages/${messageId}`, { content });
+  // 409 if someone else edited the message since this version was read.
+  const res = await http.patch(`/messages/${messageId}`, { content, version });
   return res.data;
 }
 
@@ -8,8 +8,15 @@ import { type InfiniteData } from "@tanstack/react-query";
 export function useEditMessageMutation(conversationId: number) {
   const qc = useQueryClient();
   return useMutation({
-    mutationFn: ({ id, content }: { id: number; content: string }) =>
-      editMessage(id, content),
+    mutationFn: ({
+      id,
+      content,
+      version,
+    }: {
+      id: number;
+      content: string;
+      version: number;
+    }) => editMessage(id, content, version),
     onSuccess: (msg) => {
       qc.setQueryData<InfiniteData<Message[]>>(
         qk.messages(conversationId),
@@ -68,7 +68,13 @@ export default function Chat() {
         ) : (
           <MessageList
             items={messages}
-            onEdit={(id, content) => editMut.mutate({ id, content })}
+            onEdit={(id, content) =>
+              editMut.mutate({
+                id,
+                content,
+                version: messages.find((m) => m.id === id)?.version ?? 1,
+              })
+            }
             onDelete={(ids) => delMut.mutate(ids)}
             currentUserId={currentUserId}
           />
@@ -13,6 +13,7 @@ export type Message = {
   sender_id: number;
   content: string | null;
   is_edited: boolean;
+  version: number;
   deleted: boolean;
   created_at?: string;
   attachments?: Attachment[];